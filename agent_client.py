@@ -0,0 +1,56 @@
+import os
+import json
+import socket
+import http.client
+from urllib.parse import urlparse
+
+# Address of a running agent_server.py, e.g. http://127.0.0.1:8765 or unix:/tmp/genai-agent.sock
+AGENT_SERVER_URL = os.getenv("AGENT_SERVER_URL")
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def _connection(address, timeout):
+    if address.startswith("unix:"):
+        return UnixHTTPConnection(address[len("unix:"):], timeout=timeout)
+    url = urlparse(address)
+    return http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+
+
+def send_prompt(prompt, address=AGENT_SERVER_URL, timeout=300, use_cache=True, use_router=True):
+    """
+    Sends a prompt to a running agent server.
+    :param prompt: The natural-language prompt
+    :param address: The server address (http://host:port or unix:/path)
+    :param timeout: Socket timeout in seconds
+    :param use_cache: Let the server answer from its response cache
+    :param use_router: Let the server's intent router handle structured commands
+    :return: The agent outcome, or an error dict
+    """
+    conn = _connection(address, timeout)
+    try:
+        conn.request(
+            "POST",
+            "/prompt",
+            body=json.dumps({"prompt": prompt, "use_cache": use_cache, "use_router": use_router}),
+            headers={"Content-Type": "application/json"}
+        )
+        response = conn.getresponse()
+        payload = json.loads(response.read() or b"{}")
+    except (OSError, json.JSONDecodeError) as e:
+        return {"error": f"Agent server unavailable at {address}: {e}"}
+    finally:
+        conn.close()
+
+    if response.status != 200:
+        return {"error": payload.get("error", f"Agent server returned HTTP {response.status}")}
+    return payload
@@ -0,0 +1,175 @@
+import os
+import json
+import asyncio
+import argparse
+import threading
+import socketserver
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import main
+import http_pool
+import jira_webhooks
+from issue_records import json_default
+
+AGENT_SERVER_HOST = os.getenv("AGENT_SERVER_HOST", "127.0.0.1")
+AGENT_SERVER_PORT = int(os.getenv("AGENT_SERVER_PORT", "8765"))
+# Run prompts with run_agent_async on one event loop instead of run_agent on each request thread
+AGENT_SERVER_ASYNC = os.getenv("AGENT_SERVER_ASYNC", "false").lower() in ("1", "true", "yes")
+
+
+class AgentRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, {
+                "router": main.router.stats(),
+                "http_pool": http_pool.stats(),
+                "webhooks": jira_webhooks.get_applier().stats()
+            })
+        else:
+            self._send_json(404, {"error": f"Unknown path '{self.path}'"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == jira_webhooks.JIRA_WEBHOOK_PATH:
+            if not self.server.accepts_webhooks:
+                self._send_json(403, {"error": "Webhooks are disabled on this address until JIRA_WEBHOOK_SECRET is set"})
+                return
+            # In process, so pushed changes also reach the in-memory issue cache
+            length = int(self.headers.get("Content-Length", 0))
+            self._send_json(*jira_webhooks.handle_webhook(self.rfile.read(length), self.headers, parse_qs(url.query)))
+            return
+        if self.path != "/prompt":
+            self._send_json(404, {"error": f"Unknown path '{self.path}'"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {"error": f"Invalid request body: {e}"})
+            return
+
+        prompt = body.get("prompt")
+        if not prompt:
+            self._send_json(400, {"error": "Missing 'prompt'"})
+            return
+
+        options = {
+            "max_turns": body.get("max_turns", main.AGENT_MAX_TURNS),
+            "max_tokens": body.get("max_tokens", main.AGENT_MAX_TOKENS),
+            "use_cache": body.get("use_cache", True),
+            "use_router": body.get("use_router", True)
+        }
+        try:
+            if self.server.runner is not None:
+                outcome = self.server.runner.run(main.run_agent_async(prompt, **options))
+            else:
+                # Results go back in the response, whole, not to the server's stdout
+                outcome = main.run_agent(prompt, output_format="json", quiet=True, **options)
+        except SystemExit:
+            # get_openai_response exits the process on fatal OpenAI errors
+            self._send_json(502, {"error": "OpenAI request failed"})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        outcome.pop("messages", None)
+        self._send_json(200, outcome)
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, default=json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) tuple
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "unix"
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class AsyncRunner:
+    """
+    An event loop on a background thread. Request threads hand it their
+    prompts, so every prompt shares the loop's OpenAI and backend clients.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="agent-loop", daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self):
+        self.run(main.close_async_clients())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+def warm_up():
+    # Import every backend and create its client once, before the first request
+    # (backend clients already share http_pool's keep-alive pool, sized by HTTP_POOL_SIZE)
+    main.warm_backends()
+
+
+def create_server(host=AGENT_SERVER_HOST, port=AGENT_SERVER_PORT, unix_socket=None, run_async=AGENT_SERVER_ASYNC):
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, AgentRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), AgentRequestHandler)
+    # Prompts are still served; only unauthenticated webhooks from other machines are refused
+    server.accepts_webhooks = jira_webhooks.webhooks_allowed(None if unix_socket else host)
+    server.runner = AsyncRunner() if run_async else None
+    return server
+
+
+def main_server():
+    parser = argparse.ArgumentParser(description="Serve the Jira/Datadog agent over HTTP.")
+    parser.add_argument("--host", default=AGENT_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=AGENT_SERVER_PORT)
+    parser.add_argument("--unix", help="Listen on a Unix domain socket instead of TCP")
+    parser.add_argument(
+        "--async",
+        dest="run_async",
+        action="store_true",
+        default=AGENT_SERVER_ASYNC,
+        help="Run prompts on one event loop with the async clients instead of a thread each"
+    )
+    options = parser.parse_args()
+
+    warm_up()
+    server = create_server(options.host, options.port, options.unix, options.run_async)
+    address = f"unix:{options.unix}" if options.unix else f"http://{options.host}:{options.port}"
+    print(f"[INFO] Agent server listening on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if server.runner is not None:
+            server.runner.close()
+        if options.unix and os.path.exists(options.unix):
+            os.remove(options.unix)
+
+
+if __name__ == "__main__":
+    main_server()
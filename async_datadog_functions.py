@@ -0,0 +1,76 @@
+import os
+import time
+from http_pool import get_async_client
+from retry import async_call_with_retry
+from datadog_functions import DATADOG_API_KEY, statsd, _statsd_metric, _statsd_status
+
+# Async counterparts of datadog_functions, talking to the Datadog HTTP API over the shared async client.
+# With DogStatsD enabled the datagrams are sent directly, as they never block.
+
+DD_SITE = os.getenv("DD_SITE", "datadoghq.com")
+# DATADOG_HOST overrides the endpoint, as it does for the datadog library
+API_ROOT = f"{os.getenv('DATADOG_HOST', f'https://api.{DD_SITE}').rstrip('/')}/api/v1"
+
+
+async def _post(path, payload, idempotent=True):
+    async def send():
+        response = await get_async_client().post(
+            f"{API_ROOT}{path}",
+            json=payload,
+            headers={"DD-API-KEY": DATADOG_API_KEY or ""}
+        )
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    return await async_call_with_retry("datadog", send, idempotent=idempotent)
+
+
+def _points(value):
+    if isinstance(value, (list, tuple)):
+        return [list(point) if isinstance(point, (list, tuple)) else [time.time(), point] for point in value]
+    return [[time.time(), value]]
+
+
+async def send_custom_metric(metric_name, value, tags, metric_type):
+    if statsd is not None:
+        try:
+            _statsd_metric(metric_name, value, tags, metric_type)
+            return {"status": "sent", "transport": "dogstatsd"}
+        except Exception as e:
+            print(f"[WARN] DogStatsD send failed ({e}); using the Datadog HTTP API")
+    return await _post("/series", {"series": [{
+        "metric": metric_name,
+        "points": _points(value),
+        "type": metric_type,
+        "tags": tags
+    }]})
+
+
+async def log_event(title, text, alert_type, tags):
+    if statsd is not None:
+        try:
+            statsd.event(title, text, alert_type=alert_type, tags=tags)
+            return {"status": "sent", "transport": "dogstatsd"}
+        except Exception as e:
+            print(f"[WARN] DogStatsD send failed ({e}); using the Datadog HTTP API")
+    return await _post("/events", {
+        "title": title,
+        "text": text,
+        "alert_type": alert_type,
+        "tags": tags
+    }, idempotent=False)
+
+
+async def send_service_check(check_name, status, tags):
+    if statsd is not None:
+        try:
+            statsd.service_check(check_name, _statsd_status(status), tags=tags)
+            return {"status": "sent", "transport": "dogstatsd"}
+        except Exception as e:
+            print(f"[WARN] DogStatsD send failed ({e}); using the Datadog HTTP API")
+    return await _post("/check_run", {
+        "check": check_name,
+        "status": _statsd_status(status),
+        "tags": tags,
+        "timestamp": int(time.time())
+    })
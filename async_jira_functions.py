@@ -0,0 +1,277 @@
+import asyncio
+import httpx
+from http_pool import get_async_client
+from retry import async_call_with_retry
+from jira_functions import (
+    JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN, JIRA_BULK_CHUNK_SIZE, JIRA_BULK_WORKERS,
+    ISSUE_FIELDS, issue_cache, workflow_index, _bulk_issue_updates, _bulk_create_results, _invalidate, _index,
+    _transitions_of, _known_type, _remove, _duplicates_of, _created, _bulk_duplicates, _bulk_chunks
+)
+import jira_functions
+from jira_mirror import reads_from_mirror
+from issue_records import IssueRecord
+from jira_workflows import project_of
+from jira_pagination import JIRA_PAGE_SIZE
+
+# Async counterparts of jira_functions, talking to the Jira REST API over the shared async client.
+# They share the issue cache and workflow index with the sync wrappers.
+
+API_ROOT = f"{(JIRA_URL or '').rstrip('/')}/rest/api/2"
+AUTH = (JIRA_USERNAME or "", JIRA_API_TOKEN or "")
+
+
+async def _request(method, path, idempotent=True, **kwargs):
+    async def send():
+        response = await get_async_client().request(method, f"{API_ROOT}{path}", auth=AUTH, **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    return await async_call_with_retry("jira", send, idempotent=idempotent)
+
+
+async def _issue_version(key):
+    issue = await _request("GET", f"/issue/{key}", params={"fields": "updated"})
+    return issue["fields"].get("updated")
+
+
+async def create_issue(project: str, summary: str, description: str, issue_type: str, force: bool = False) -> dict:
+    try:
+        duplicates = None if force else await asyncio.to_thread(_duplicates_of, project, summary, description)
+        if duplicates:
+            return duplicates
+        new_issue = await _request("POST", "/issue", idempotent=False, json={"fields": {
+            "project": {"key": project},
+            "summary": summary,
+            "description": description,
+            "issuetype": {"name": issue_type}
+        }})
+        await asyncio.to_thread(_invalidate, None, project)
+        await asyncio.to_thread(
+            _created, [{"key": new_issue.get("key"), "summary": summary, "description": description, "issue_type": issue_type}]
+        )
+        return {
+            "key": new_issue.get("key"),
+            "id": new_issue.get("id"),
+            "message": "Issue created successfully"
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def update_issue(issue_id=None, issue_key=None, summary=None, description=None, issue_type=None) -> dict:
+    key = issue_id or issue_key
+    try:
+        fields = {}
+        if summary:
+            fields["summary"] = summary
+        if description:
+            fields["description"] = description
+        if issue_type:
+            fields["issuetype"] = {"name": issue_type}
+
+        await _request("PUT", f"/issue/{key}", json={"fields": fields})
+        await asyncio.to_thread(_invalidate, key)
+        workflow_index.note_type(key, issue_type)
+        await asyncio.to_thread(_index, [{"key": key, "summary": summary, "description": description}])
+        return {"message": f"Issue {key} updated successfully"}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def delete_issue(issue_id=None, issue_key=None) -> dict:
+    key = issue_id or issue_key
+    try:
+        await _request("DELETE", f"/issue/{key}")
+        await asyncio.to_thread(_remove, key)
+        return {"message": f"Issue {key} deleted successfully"}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def get_issue(issue_id=None, issue_key=None) -> dict:
+    key = issue_id or issue_key
+
+    async def fetch():
+        issue = await _request("GET", f"/issue/{key}", params={"fields": ",".join(ISSUE_FIELDS + ["updated"])})
+        result = {
+            "id": issue.get("id"),
+            "key": issue.get("key"),
+            "summary": issue["fields"]["summary"],
+            "description": issue["fields"]["description"],
+            "type": issue["fields"]["issuetype"]["name"]
+        }
+        await asyncio.to_thread(_index, [result])
+        workflow_index.note_type(result["key"], result["type"])
+        return result, issue["fields"].get("updated")
+
+    try:
+        if "-" in key and reads_from_mirror(project_of(key)):
+            # The mirror syncs with the blocking client; keep it off the event loop
+            return await asyncio.to_thread(jira_functions.get_issue, issue_key=key)
+        return await issue_cache.aread("issue", key, fetch, lambda: _issue_version(key))
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def iter_issues(project: str, page_size=JIRA_PAGE_SIZE):
+    jql = f"project = {project} ORDER BY key ASC"
+    start = 0
+    while True:
+        page = await _request("GET", "/search", params={
+            "jql": jql, "startAt": start, "maxResults": page_size, "fields": ",".join(ISSUE_FIELDS)
+        })
+        for issue in page["issues"]:
+            fields = issue["fields"]
+            yield IssueRecord(issue["id"], issue["key"], fields["summary"], fields["description"], fields["issuetype"]["name"])
+        start += len(page["issues"])
+        if not page["issues"] or start >= page.get("total", start + 1):
+            return
+
+
+async def get_issues(project: str, limit=None, page_size=JIRA_PAGE_SIZE) -> dict:
+    if reads_from_mirror(project):
+        return await asyncio.to_thread(jira_functions.get_issues, project, limit)
+    try:
+        issues = []
+        async for issue in iter_issues(project, page_size):
+            if limit is not None and len(issues) >= limit:
+                break
+            issues.append(issue)
+        await asyncio.to_thread(_index, issues)
+        return {"issues": issues}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def search_issues(query: str, project=None, limit=10) -> dict:
+    # SQLite lookups are fast, but a mirrored project may sync first
+    return await asyncio.to_thread(jira_functions.search_issues, query, project, limit)
+
+
+async def get_issue_comments(issue_id=None, issue_key=None) -> dict:
+    key = issue_id or issue_key
+
+    async def fetch():
+        response = await _request("GET", f"/issue/{key}/comment")
+        await asyncio.to_thread(_index, [{"key": key, "comments": [comment.get("body") for comment in response.get("comments", [])]}])
+        return {
+            "comments": [
+                {
+                    "id": comment.get("id"),
+                    "body": comment.get("body")
+                }
+                for comment in response.get("comments", [])
+            ]
+        }, None
+
+    try:
+        return await issue_cache.aread("comments", key, fetch, lambda: _issue_version(key))
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def _list_transitions(key):
+    # Read with the issue's type in the same request: workflows differ per issue type
+    issue = await _request("GET", f"/issue/{key}", params={"fields": "issuetype", "expand": "transitions"})
+    transitions = _transitions_of(issue)
+    workflow_index.learn(key, issue["fields"]["issuetype"]["name"], transitions)
+    return transitions
+
+
+async def get_issue_transitions(issue_id=None, issue_key=None) -> dict:
+    key = issue_id or issue_key
+
+    async def fetch():
+        return {"transitions": await _list_transitions(key)}, None
+
+    try:
+        return await issue_cache.aread("transitions", key, fetch, lambda: _issue_version(key))
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def _post_transition(key, transition_id):
+    await _request("POST", f"/issue/{key}/transitions", idempotent=False, json={"transition": {"id": str(transition_id)}})
+
+
+async def transition_issue(issue_id=None, issue_key=None, transition_id=None, status=None) -> dict:
+    key = issue_id or issue_key
+    try:
+        if transition_id:
+            await _post_transition(key, transition_id)
+        elif status:
+            transition_id = workflow_index.resolve(key, status) if await asyncio.to_thread(_known_type, key) else None
+            if transition_id is not None:
+                try:
+                    await _post_transition(key, transition_id)
+                except httpx.HTTPStatusError:
+                    # The learned transition is not available from this issue's current status
+                    workflow_index.forget(key, status)
+                    transition_id = None
+            if transition_id is None:
+                await _list_transitions(key)
+                transition_id = workflow_index.resolve(key, status)
+                if transition_id is None:
+                    raise ValueError(f"No transition to '{status}' is available for issue {key}")
+                await _post_transition(key, transition_id)
+        else:
+            return {"error": "Either transition_id or status is required"}
+        await asyncio.to_thread(_invalidate, key)
+        return {"message": f"Issue {key} transitioned successfully"}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# --- Bulk operations ---
+
+async def _create_chunk(chunk):
+    try:
+        response = await _request("POST", "/issue/bulk", idempotent=False, json={"issueUpdates": _bulk_issue_updates(chunk)})
+    except httpx.HTTPStatusError as e:
+        # Jira answers 400 when every issue in the request failed
+        if e.response.status_code != 400:
+            raise
+        response = e.response.json()
+    for project in {item["project"] for item in chunk}:
+        await asyncio.to_thread(_invalidate, None, project)
+    results = _bulk_create_results(chunk, response)
+    await asyncio.to_thread(
+        _created, [dict(item, key=result["key"]) for item, result in zip(chunk, results) if "key" in result]
+    )
+    return results
+
+
+async def bulk_create_issues(issues: list, chunk_size=JIRA_BULK_CHUNK_SIZE, force: bool = False) -> dict:
+    results = await asyncio.to_thread(_bulk_duplicates, issues, force)
+    chunks = _bulk_chunks(results, chunk_size)
+    outcomes = await asyncio.gather(
+        *(_create_chunk([issues[index] for index in indexes]) for indexes in chunks), return_exceptions=True
+    )
+    for indexes, outcome in zip(chunks, outcomes):
+        if isinstance(outcome, Exception):
+            outcome = [{"error": str(outcome)} for _ in indexes]
+        for index, result in zip(indexes, outcome):
+            results[index] = result
+    return {"results": [dict(result, index=index) for index, result in enumerate(results)]}
+
+
+async def _run_bulk(func, items, max_workers):
+    slots = asyncio.Semaphore(max_workers)
+
+    async def run(item):
+        async with slots:
+            try:
+                return await func(**item)
+            except Exception as e:
+                return {"error": str(e)}
+
+    results = await asyncio.gather(*(run(item) for item in items))
+    return {"results": [dict(result, index=index) for index, result in enumerate(results)]}
+
+
+async def bulk_update_issues(updates: list, max_workers=JIRA_BULK_WORKERS) -> dict:
+    return await _run_bulk(update_issue, updates, max_workers)
+
+
+async def bulk_transition_issues(transitions: list, max_workers=JIRA_BULK_WORKERS) -> dict:
+    return await _run_bulk(transition_issue, transitions, max_workers)
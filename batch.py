@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+from issue_records import json_default
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+
+# Tools whose successful results are replayed on resume instead of being executed twice
+NON_IDEMPOTENT_TOOLS = {"create_issue", "bulk_create_issues"}
+
+
+class Checkpoint:
+    """
+    Append-only journal of finished prompts and of side effects already applied,
+    so a crashed batch can resume without re-creating issues.
+
+    Side effects are keyed by prompt and by the position of the call among
+    that prompt's non-idempotent calls, not by the call's arguments: a
+    re-run prompt may be worded differently by the model the second time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self.failed = set()
+        self.applied = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash can leave a torn last line
+                        continue
+                    if record["event"] == "done":
+                        self.done.add(record["id"])
+                    elif record["event"] == "failed":
+                        self.failed.add(record["id"])
+                    elif record["event"] == "applied":
+                        self.applied.setdefault(record["id"], {})[record["key"]] = record["result"]
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _write(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record, default=json_default) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_applied(self, prompt_id, key, result):
+        self.applied.setdefault(prompt_id, {})[key] = result
+        self._write({"event": "applied", "id": prompt_id, "key": key, "result": result})
+
+    def mark_done(self, prompt_id):
+        self.done.add(prompt_id)
+        self._write({"event": "done", "id": prompt_id})
+
+    def mark_failed(self, prompt_id):
+        self.failed.add(prompt_id)
+        self._write({"event": "failed", "id": prompt_id})
+
+    def close(self):
+        self._file.close()
+
+
+def _function_caller(prompt_id, checkpoint):
+    applied = checkpoint.applied.get(prompt_id, {})
+    calls = []
+    lock = threading.Lock()
+
+    def call(name, args):
+        if name not in NON_IDEMPOTENT_TOOLS:
+            return main.call_function(name, args)
+        with lock:
+            # Calls made in parallel within one turn are numbered in the order they start
+            key = str(len(calls))
+            calls.append(name)
+        if key in applied:
+            return applied[key]
+        result = main.call_function(name, args)
+        if isinstance(result, dict) and "error" not in result:
+            checkpoint.record_applied(prompt_id, key, result)
+        return result
+
+    return call
+
+
+def read_prompts(path):
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            prompt_id = str(record.get("id") or record.get("request_id") or line_number)
+            prompt = record.get("prompt") or record.get("body")
+            yield prompt_id, prompt
+
+
+def run_prompt(prompt_id, prompt, checkpoint):
+    record = {"id": prompt_id, "prompt": prompt}
+    try:
+        outcome = main.run_agent(prompt, function_caller=_function_caller(prompt_id, checkpoint))
+    except SystemExit:
+        record["error"] = "OpenAI request failed"
+        return record
+    except Exception as e:
+        record["error"] = str(e)
+        return record
+
+    outcome.pop("messages", None)
+    record.update(outcome)
+    errors = [_tool_error(call["result"]) for call in outcome["tool_results"]]
+    if errors and all(errors):
+        # Nothing the prompt asked for happened; journal it as failed so --resume runs it again
+        record["error"] = f"Every tool call failed: {errors[-1]}"
+    return record
+
+
+def _tool_error(result):
+    return result.get("error") if isinstance(result, dict) else None
+
+
+def _drop_retried(output_path, retried):
+    # Failed prompts are run again on resume; drop their old result lines so each prompt has one
+    if not retried or not os.path.exists(output_path):
+        return
+    directory = os.path.dirname(os.path.abspath(output_path))
+    with open(output_path, encoding="utf-8") as source, \
+            tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, delete=False) as target:
+        for line in source:
+            try:
+                prompt_id = json.loads(line).get("id")
+            except json.JSONDecodeError:
+                continue
+            if prompt_id not in retried:
+                target.write(line)
+    os.replace(target.name, output_path)
+
+
+def run_batch(input_path, output_path, workers=BATCH_WORKERS, checkpoint_path=None):
+    """
+    Streams prompts from a JSONL file through the agent and streams results to another JSONL file.
+    :param input_path: JSONL with one {"id", "prompt"} object per line
+    :param output_path: JSONL that receives one result per finished prompt, written as each one finishes
+    :param workers: Number of prompts processed at the same time
+    :param checkpoint_path: Resume journal (defaults to <output_path>.checkpoint)
+    :return: Counts of processed, skipped and failed prompts
+    """
+    checkpoint = Checkpoint(checkpoint_path or f"{output_path}.checkpoint")
+    _drop_retried(output_path, checkpoint.failed - checkpoint.done)
+    stats = {"processed": 0, "skipped": 0, "failed": 0}
+    output_lock = threading.Lock()
+    # Keep the number of queued prompts bounded so huge inputs are streamed
+    queued = threading.BoundedSemaphore(workers * 2)
+
+    with open(output_path, "a", encoding="utf-8") as output, ThreadPoolExecutor(max_workers=workers) as pool:
+        def finish(future):
+            # Runs as soon as the prompt finishes, so one slow prompt never holds back the others' results
+            try:
+                record = future.result()
+                with output_lock:
+                    output.write(json.dumps(record, default=json_default) + "\n")
+                    output.flush()
+                    if "error" in record:
+                        checkpoint.mark_failed(record["id"])
+                        stats["failed"] += 1
+                    else:
+                        checkpoint.mark_done(record["id"])
+                        stats["processed"] += 1
+            finally:
+                queued.release()
+
+        for prompt_id, prompt in read_prompts(input_path):
+            if prompt_id in checkpoint.done:
+                stats["skipped"] += 1
+                continue
+            queued.acquire()
+            pool.submit(run_prompt, prompt_id, prompt, checkpoint).add_done_callback(finish)
+
+    checkpoint.close()
+    return stats
+
+
+def main_batch():
+    parser = argparse.ArgumentParser(description="Run a JSONL file of prompts through the agent.")
+    parser.add_argument("input", help="JSONL file of prompts")
+    parser.add_argument("output", help="JSONL file to append results to")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--checkpoint", help="Resume journal (default: <output>.checkpoint)")
+    options = parser.parse_args()
+
+    stats = run_batch(options.input, options.output, options.workers, options.checkpoint)
+    print(f"[INFO] Batch finished: {stats['processed']} processed, {stats['skipped']} skipped, {stats['failed']} failed")
+    routing = main.router.stats()
+    print(
+        f"[INFO] Intent router: {routing['hit_rate']:.0%} of prompts routed without the LLM, "
+        f"~{routing['estimated_seconds_saved']:.1f}s saved"
+    )
+    if stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_batch()
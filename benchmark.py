@@ -0,0 +1,323 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import importlib
+import contextlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from mock_backends import BackendConfig, start_mock_backends
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Prompt mix; the mock model picks a tool from the keywords in each prompt
+BENCH_PROMPTS = [
+    "Show me what BENCH-{n} is about",
+    "Please create a ticket about flaky test number {n}",
+    "list everything in the BENCH project",
+    "move BENCH-{n} to done",
+    "log that benchmark run {n} started",
+]
+WORKLOADS = ("single", "concurrent", "async", "batch", "tools")
+
+
+def configure_environment(servers, caches=False):
+    # Must run before main or any backend module is imported; explicit settings in the environment win
+    defaults = {
+        "OPENAI_API_KEY": "mock",
+        "OPENAI_BASE_URL": f"{servers['openai'].url}/v1",
+        "JIRA_INSTANCE_URL": servers["jira"].url,
+        "JIRA_USERNAME": "mock",
+        "JIRA_API_TOKEN": "mock",
+        "DATADOG_API_KEY": "mock",
+        "DATADOG_APP_KEY": "mock",
+        "DATADOG_HOST": servers["datadog"].url,
+        "DATADOG_TRANSPORT": "http",
+        "AGENT_SERVER_URL": "",
+        "TRACE_EXPORT_PATH": "",
+    }
+    for backend in ("OPENAI", "JIRA", "DATADOG"):
+        # Measure the code, not the client-side rate limiter
+        defaults[f"{backend}_RATE_LIMIT"] = "0"
+        defaults[f"{backend}_RETRY_BASE_DELAY"] = "0.01"
+    if not caches:
+        defaults.update({
+            "RESPONSE_CACHE_PATH": "",
+            "ROUTER_MIN_CONFIDENCE": "1.1",
+            "JIRA_CACHE_TTL_ISSUE": "0",
+            "JIRA_CACHE_TTL_COMMENTS": "0",
+            "JIRA_CACHE_TTL_TRANSITIONS": "0",
+        })
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+
+
+def make_prompts(count):
+    return [BENCH_PROMPTS[index % len(BENCH_PROMPTS)].format(n=index + 1) for index in range(count)]
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _failed(outcome):
+    return outcome.get("stop_reason") != "completed" or any(
+        isinstance(call["result"], dict) and "error" in call["result"] for call in outcome.get("tool_results", [])
+    )
+
+
+def summarize(latencies, errors, seconds):
+    return {
+        "prompts": len(latencies),
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "throughput": round(len(latencies) / seconds, 2) if seconds else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1) if latencies else None,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def _timed_prompt(agent, prompt):
+    start = time.perf_counter()
+    try:
+        failed = _failed(agent.run_agent(prompt))
+    except (Exception, SystemExit):
+        failed = True
+    return time.perf_counter() - start, failed
+
+
+def bench_single(prompts, concurrency):
+    agent = importlib.import_module("main")
+    start = time.perf_counter()
+    results = [_timed_prompt(agent, prompt) for prompt in prompts]
+    return summarize([latency for latency, _ in results], sum(failed for _, failed in results), time.perf_counter() - start)
+
+
+def bench_concurrent(prompts, concurrency):
+    agent = importlib.import_module("main")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda prompt: _timed_prompt(agent, prompt), prompts))
+    return summarize([latency for latency, _ in results], sum(failed for _, failed in results), time.perf_counter() - start)
+
+
+def bench_async(prompts, concurrency):
+    agent = importlib.import_module("main")
+
+    async def run_all():
+        slots = asyncio.Semaphore(concurrency)
+
+        async def run(prompt):
+            async with slots:
+                start = time.perf_counter()
+                try:
+                    failed = _failed(await agent.run_agent_async(prompt))
+                except (Exception, SystemExit):
+                    failed = True
+                return time.perf_counter() - start, failed
+
+        try:
+            return await asyncio.gather(*(run(prompt) for prompt in prompts))
+        finally:
+            await agent.close_async_clients()
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    return summarize([latency for latency, _ in results], sum(failed for _, failed in results), time.perf_counter() - start)
+
+
+def bench_batch(prompts, concurrency):
+    batch = importlib.import_module("batch")
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "prompts.jsonl")
+        output_path = os.path.join(directory, "results.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            for index, prompt in enumerate(prompts):
+                f.write(json.dumps({"id": str(index), "prompt": prompt}) + "\n")
+
+        start = time.perf_counter()
+        batch.run_batch(input_path, output_path, workers=concurrency)
+        seconds = time.perf_counter() - start
+
+        latencies, errors = [], 0
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                latencies.append(sum(turn["seconds"] for turn in record.get("turns", [])))
+                errors += "error" in record or _failed(record)
+    return summarize(latencies, errors, seconds)
+
+
+def bench_tools(prompts, concurrency):
+    # The LangChain tools in jira_function.py, called directly (no model in the loop)
+    tools = importlib.import_module("jira_function")
+    calls = [
+        (tools.get_issue, {"issue_id": f"BENCH-{index + 1}"}) if index % 2 == 0
+        else (tools.get_issue_comments, {"issue_id": f"BENCH-{index + 1}"})
+        for index in range(len(prompts))
+    ]
+
+    def run(call):
+        tool, args = call
+        start = time.perf_counter()
+        try:
+            result = tool.invoke(args)
+            failed = isinstance(result, dict) and "error" in result
+        except Exception:
+            failed = True
+        return time.perf_counter() - start, failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(run, calls))
+    return summarize([latency for latency, _ in results], sum(failed for _, failed in results), time.perf_counter() - start)
+
+
+BENCHMARKS = {
+    "single": bench_single,
+    "concurrent": bench_concurrent,
+    "async": bench_async,
+    "batch": bench_batch,
+    "tools": bench_tools,
+}
+
+
+def _run_workload(name, prompts, concurrency, warmup):
+    # The agent logs every call; keep the report readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if warmup:
+            BENCHMARKS[name](prompts[:warmup], concurrency)
+        return BENCHMARKS[name](prompts, concurrency)
+
+
+def run_workload(name, prompts, concurrency, warmup):
+    """
+    Runs one workload in a fresh interpreter.
+    :return: The workload summary; its peak RSS is that workload's alone, with no state left by earlier ones
+    """
+    # Spawned, not forked: the child inherits the mock backend settings through the environment only
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_run_workload, name, prompts, concurrency, warmup).result()
+
+
+def compare(results, baseline, tolerance):
+    """
+    Flags workloads that got slower than a previous run.
+    :param results: This run's results
+    :param baseline: A results dict written by an earlier run
+    :param tolerance: Allowed relative slowdown, e.g. 0.2 for 20%
+    :return: A list of human-readable regressions (empty if none)
+    """
+    regressions = []
+    for name, current in results["workloads"].items():
+        previous = baseline.get("workloads", {}).get(name)
+        if not previous or "skipped" in current or "skipped" in previous:
+            continue
+        if previous.get("throughput") and current["throughput"] < previous["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput']}/s vs {previous['throughput']}/s")
+        for metric in ("p50_ms", "p99_ms"):
+            if previous.get(metric) and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {current[metric]} vs {previous[metric]}")
+        if previous.get("peak_rss_mb") and current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {current['peak_rss_mb']} MB vs {previous['peak_rss_mb']} MB")
+        if current["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: {current['errors']} errors vs {previous.get('errors', 0)}")
+    return regressions
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark the agent offline against local mock backends.")
+    parser.add_argument("--prompts", type=int, default=50, help="Prompts per workload")
+    parser.add_argument("--concurrency", type=int, default=16, help="Prompts in flight for the parallel workloads")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed prompts run first, so imports and client setup are excluded")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help=f"Comma-separated subset of {', '.join(WORKLOADS)}")
+    parser.add_argument("--openai-latency", type=float, default=50, help="Mean injected OpenAI latency in ms")
+    parser.add_argument("--jira-latency", type=float, default=20, help="Mean injected Jira latency in ms")
+    parser.add_argument("--datadog-latency", type=float, default=5, help="Mean injected Datadog latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of mock responses that are 503s")
+    parser.add_argument("--caches", action="store_true", help="Keep the response cache, intent router and Jira cache on")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Results file from an earlier run; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown when comparing")
+    options = parser.parse_args()
+
+    baseline = None
+    if options.compare:
+        # Read now: --output may name the same file
+        with open(options.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    workloads = [name.strip() for name in options.workloads.split(",") if name.strip()]
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    servers = start_mock_backends({
+        "openai": BackendConfig(options.openai_latency, options.error_rate),
+        "jira": BackendConfig(options.jira_latency, options.error_rate),
+        "datadog": BackendConfig(options.datadog_latency, options.error_rate),
+    })
+    configure_environment(servers, options.caches)
+    prompts = make_prompts(options.prompts)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(options).items() if key not in ("output", "compare")},
+        "workloads": {}
+    }
+    try:
+        for name in workloads:
+            print(f"[INFO] Running {name} ({len(prompts)} prompts)...")
+            try:
+                summary = run_workload(name, prompts, options.concurrency, options.warmup)
+            except Exception as e:
+                summary = {"skipped": f"{type(e).__name__}: {e}"}
+            results["workloads"][name] = summary
+            if "skipped" in summary:
+                print(f"[WARN] {name} skipped: {summary['skipped']}")
+            else:
+                print(
+                    f"[INFO] {name}: {summary['throughput']} prompts/s, p50 {summary['p50_ms']} ms, "
+                    f"p99 {summary['p99_ms']} ms, {summary['errors']} errors, peak RSS {summary['peak_rss_mb']} MB"
+                )
+    finally:
+        results["backend_requests"] = {backend: dict(server.requests) for backend, server in servers.items()}
+        for server in servers.values():
+            server.stop()
+
+    with open(options.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"[INFO] Results written to {options.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, options.tolerance)
+        for regression in regressions:
+            print(f"[ERROR] Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("[INFO] No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main_benchmark()
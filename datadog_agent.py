@@ -5,6 +5,7 @@ import time
 from dotenv import load_dotenv
 from openai import OpenAI, RateLimitError, OpenAIError
 from datadog_functions import send_custom_metric, log_event, send_service_check
+from tool_dispatcher import dispatch_tool_calls
 
 load_dotenv()
 
@@ -22,14 +23,13 @@ def main():
 
     message = response.choices[0].message
 
-# Execute tool call
-    tool_call = message.tool_calls[0]
-    name = tool_call.function.name
-    args = json.loads(tool_call.function.arguments)
+# Execute every tool call the model returned
+    for tool_call in message.tool_calls or []:
+        print(f"[INFO] Calling function: {tool_call.function.name} with args: {tool_call.function.arguments}")
 
-    print(f"[INFO] Calling function: {name} with args: {args}")
-    result = call_function(name, args)
-    print(json.dumps(result, indent=2))
+    for call in dispatch_tool_calls(message.tool_calls, call_function):
+        print(f"[INFO] Result from {call['name']}:")
+        print(json.dumps(call["result"], indent=2))
 
 def call_function(name, args):
 
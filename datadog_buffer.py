@@ -0,0 +1,92 @@
+import os
+import time
+import atexit
+import threading
+
+# Seconds between background flushes of buffered metrics
+DATADOG_FLUSH_INTERVAL = float(os.getenv("DATADOG_FLUSH_INTERVAL", "10"))
+
+
+class MetricsBuffer:
+    """
+    Aggregates metric points in process and sends each flush window in one batch.
+
+    Points are aggregated per (name, type, tags): gauges keep the last value,
+    counts and rates are summed, and distributions keep every value.
+    """
+
+    def __init__(self, send_batch, flush_interval=DATADOG_FLUSH_INTERVAL):
+        self.send_batch = send_batch
+        self.flush_interval = flush_interval
+        self._points = {}
+        self._window_start = time.time()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, metric_name, value, tags=None, metric_type="gauge"):
+        key = (metric_name, metric_type or "gauge", tuple(sorted(tags or [])))
+        with self._lock:
+            if key[1] == "distribution":
+                self._points.setdefault(key, []).append(value)
+            elif key[1] in ("count", "rate"):
+                self._points[key] = self._points.get(key, 0) + value
+            else:
+                self._points[key] = value
+            if self._thread is None:
+                self._start()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="datadog-metrics-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            points, self._points = self._points, {}
+            window_start, self._window_start = self._window_start, time.time()
+        if not points:
+            return
+
+        now = int(time.time())
+        interval = max(1, int(now - window_start))
+        metrics = []
+        distributions = []
+        for (metric_name, metric_type, tags), value in points.items():
+            if metric_type == "distribution":
+                distributions.append({"metric": metric_name, "points": [(now, value)], "tags": list(tags)})
+            else:
+                metric = {"metric": metric_name, "points": [(now, value)], "tags": list(tags), "type": metric_type}
+                if metric_type in ("count", "rate"):
+                    metric["interval"] = interval
+                    if metric_type == "rate":
+                        metric["points"] = [(now, value / interval)]
+                metrics.append(metric)
+
+        try:
+            self.send_batch(metrics, distributions)
+        except Exception as e:
+            # Metrics are best effort; never let a flush failure reach the caller
+            print(f"[WARN] Datadog metric flush failed: {e}")
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+
+def _send_to_datadog(metrics, distributions):
+    # Imported on first flush so recording a metric never loads the Datadog client
+    from datadog_functions import _send_batch
+    _send_batch(metrics, distributions)
+
+
+metrics_buffer = MetricsBuffer(_send_to_datadog)
+
+
+def record_metric(metric_name, value, tags=None, metric_type="gauge"):
+    # Non-blocking: aggregated in process and flushed in the background
+    metrics_buffer.add(metric_name, value, tags, metric_type)
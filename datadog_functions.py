@@ -1,7 +1,15 @@
 from datadog import initialize, api
+from datadog.dogstatsd import DogStatsd
+from datadog.api.http_client import RequestClient, _get_user_agent_header
+from datadog.api.exceptions import HTTPError, ApiError
 from dotenv import load_dotenv
 import os
 import time
+import socket
+import threading
+from datadog_buffer import record_metric
+from retry import call_with_retry
+from http_pool import create_session
 
 # Load environment variables
 load_dotenv('.env')
@@ -12,23 +20,112 @@ DATADOG_APP_KEY = os.getenv("DATADOG_APP_KEY")
 
 options = {
     'api_key': DATADOG_API_KEY,
-    'app_key': DATADOG_APP_KEY
+    'app_key': DATADOG_APP_KEY,
+    # Muted, the client returns {"errors": ...} instead of raising, and call_with_retry never sees a failure
+    'mute': False
 }
 
 initialize(**options)
 
+# The last HTTP response seen by this thread, so API errors can be given its status
+_last_response = threading.local()
+
+def _remember_response(response, *args, **kwargs):
+    _last_response.value = response
+
+# The API client keeps one class-level session; hand it one on the shared connection pool,
+# with the headers the client would have set on a session of its own
+RequestClient._session = create_session()
+RequestClient._session.headers["User-Agent"] = _get_user_agent_header()
+RequestClient._session.hooks["response"].append(_remember_response)
+
+# Transport: "http" (Datadog API) or "dogstatsd" (fire-and-forget datagrams to a local agent)
+DATADOG_TRANSPORT = os.getenv("DATADOG_TRANSPORT", "http").lower()
+DD_AGENT_HOST = os.getenv("DD_AGENT_HOST", "localhost")
+DD_DOGSTATSD_PORT = int(os.getenv("DD_DOGSTATSD_PORT", "8125"))
+DD_DOGSTATSD_SOCKET = os.getenv("DD_DOGSTATSD_SOCKET")
+# Seconds a one-off "rate" point covers. A rate is a per-second value; DogStatsD has no
+# rate type, so it gets rate * interval as a count (buffered rates use the flush window)
+DATADOG_RATE_INTERVAL = int(os.getenv("DATADOG_RATE_INTERVAL", "10"))
+
+SERVICE_CHECK_STATUSES = {"ok": 0, "warning": 1, "critical": 2, "unknown": 3}
+
+def _create_statsd():
+    if DATADOG_TRANSPORT != "dogstatsd":
+        return None
+    try:
+        if DD_DOGSTATSD_SOCKET:
+            if not os.path.exists(DD_DOGSTATSD_SOCKET):
+                raise OSError(f"socket {DD_DOGSTATSD_SOCKET} does not exist")
+            return DogStatsd(socket_path=DD_DOGSTATSD_SOCKET, disable_telemetry=True)
+        socket.getaddrinfo(DD_AGENT_HOST, DD_DOGSTATSD_PORT, type=socket.SOCK_DGRAM)
+        return DogStatsd(host=DD_AGENT_HOST, port=DD_DOGSTATSD_PORT, disable_telemetry=True)
+    except OSError as e:
+        print(f"[WARN] DogStatsD unavailable ({e}); falling back to the Datadog HTTP API")
+        return None
+
+statsd = _create_statsd()
+
 # --- Core Functions (Free Tier) ---
 
+def _api_call(func, **kwargs):
+    # The client's HTTPError and ApiError carry no status; attach the response so retry.py can classify them
+    _last_response.value = None
+    try:
+        return func(**kwargs)
+    except (HTTPError, ApiError) as e:
+        response = _last_response.value
+        if response is not None:
+            e.response = response
+            e.status_code = response.status_code
+        raise
+
+def _send(func, idempotent=True, **kwargs):
+    return call_with_retry("datadog", _api_call, func, idempotent=idempotent, **kwargs)
+
+def _statsd_metric(metric_name, value, tags, metric_type, interval=DATADOG_RATE_INTERVAL):
+    if metric_type == "rate":
+        statsd.increment(metric_name, value * interval, tags=tags)
+    elif metric_type == "count":
+        statsd.increment(metric_name, value, tags=tags)
+    elif metric_type == "distribution":
+        statsd.distribution(metric_name, value, tags=tags)
+    elif metric_type == "histogram":
+        statsd.histogram(metric_name, value, tags=tags)
+    else:
+        statsd.gauge(metric_name, value, tags=tags)
+
+def _statsd_status(status):
+    if isinstance(status, str) and status.lower() in SERVICE_CHECK_STATUSES:
+        return SERVICE_CHECK_STATUSES[status.lower()]
+    return int(status)
+
 def send_custom_metric(metric_name, value, tags, metric_type):
-    return api.Metric.send(
+    if statsd is not None:
+        try:
+            _statsd_metric(metric_name, value, tags, metric_type)
+            return {"status": "sent", "transport": "dogstatsd"}
+        except Exception as e:
+            print(f"[WARN] DogStatsD send failed ({e}); using the Datadog HTTP API")
+    return _send(
+        api.Metric.send,
         metric=metric_name,
         points=value,
         tags=tags,
-        type=metric_type
+        type=metric_type,
+        **({"interval": DATADOG_RATE_INTERVAL} if metric_type == "rate" else {})
     )
 
 def log_event(title, text, alert_type, tags):
-    return api.Event.create(
+    if statsd is not None:
+        try:
+            statsd.event(title, text, alert_type=alert_type, tags=tags)
+            return {"status": "sent", "transport": "dogstatsd"}
+        except Exception as e:
+            print(f"[WARN] DogStatsD send failed ({e}); using the Datadog HTTP API")
+    return _send(
+        api.Event.create,
+        idempotent=False,
         title=title,
         text=text,
         alert_type=alert_type,
@@ -36,21 +133,64 @@ def log_event(title, text, alert_type, tags):
     )
 
 def send_service_check(check_name, status, tags):
-    return api.ServiceCheck.check(
+    if statsd is not None:
+        try:
+            statsd.service_check(check_name, _statsd_status(status), tags=tags)
+            return {"status": "sent", "transport": "dogstatsd"}
+        except Exception as e:
+            print(f"[WARN] DogStatsD send failed ({e}); using the Datadog HTTP API")
+    return _send(
+        api.ServiceCheck.check,
         check=check_name,
-        status=status,
+        # The API also only accepts 0-3
+        status=_statsd_status(status),
         tags=tags
     )
 
+# --- Buffered Metrics ---
+
+def _send_batch(metrics, distributions):
+    # Copies: each point is dropped once DogStatsD has taken it, so a failure part way
+    # through only sends the rest over HTTP
+    metrics = [dict(metric, points=list(metric["points"])) for metric in metrics]
+    distributions = [
+        dict(distribution, points=[(timestamp, list(values)) for timestamp, values in distribution["points"]])
+        for distribution in distributions
+    ]
+    if statsd is not None:
+        try:
+            for metric in metrics:
+                while metric["points"]:
+                    _, value = metric["points"][0]
+                    _statsd_metric(metric["metric"], value, metric["tags"], metric["type"], metric.get("interval", 1))
+                    metric["points"].pop(0)
+            for distribution in distributions:
+                for _, values in distribution["points"]:
+                    while values:
+                        statsd.distribution(distribution["metric"], values[0], tags=distribution["tags"])
+                        values.pop(0)
+            return
+        except Exception as e:
+            print(f"[WARN] DogStatsD send failed ({e}); sending the rest with the Datadog HTTP API")
+    metrics = [metric for metric in metrics if metric["points"]]
+    for distribution in distributions:
+        distribution["points"] = [(timestamp, values) for timestamp, values in distribution["points"] if values]
+    distributions = [distribution for distribution in distributions if distribution["points"]]
+    if metrics:
+        _send(api.Metric.send, metrics=metrics)
+    if distributions:
+        _send(api.Distribution.send, distributions=distributions)
+
 # --- Helper Function ---
 
 def send_latency_metric(latency_seconds):
-    return send_custom_metric(
+    record_metric(
         metric_name="jira.api.call.latency",
         value=latency_seconds,
         tags=["env:prod", "jira"],
         metric_type="gauge"
     )
+    return {"status": "queued"}
 
 # --- Paid Tier Functions (Commented Out) ---
 
@@ -0,0 +1,100 @@
+import os
+import importlib.util
+import weakref
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# One connection-pool manager for every backend client in the process.
+# Sync clients (atlassian Jira, pycontribs JIRA, Datadog) get their own requests.Session
+# but share a single HTTPAdapter, so keep-alive connections are reused across all of them.
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+HTTP_KEEPALIVE = os.getenv("HTTP_KEEPALIVE", "true").lower() in ("1", "true", "yes")
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+# requests only speaks HTTP/1.1; the async client negotiates HTTP/2 when the h2 package is installed
+HTTP2 = os.getenv("HTTP2", "true").lower() in ("1", "true", "yes")
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+
+_adapter = None
+_adapter_lock = threading.Lock()
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_adapter():
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            # Retries are handled by retry.call_with_retry, not by urllib3
+            _adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+    return _adapter
+
+
+def mount(session):
+    """
+    Routes an existing session's requests through the shared pool.
+    :param session: A requests.Session, e.g. one created by a backend library
+    :return: The same session
+    """
+    adapter = get_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not HTTP_KEEPALIVE:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def create_session():
+    # A fresh session (own auth and headers) on the shared pool
+    return mount(requests.Session())
+
+
+def stats():
+    """
+    Connection reuse per host for the shared sync pool.
+    :return: {host: {"requests", "connections", "reused"}}
+    """
+    pools = get_adapter().poolmanager.pools
+    result = {}
+    with pools.lock:
+        entries = list(pools._container.items())
+    for key, pool in entries:
+        requests_made = pool.num_requests
+        result[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+            "requests": requests_made,
+            "connections": pool.num_connections,
+            "reused": max(0, requests_made - pool.num_connections)
+        }
+    return result
+
+
+def get_async_client():
+    """
+    The shared httpx client for the running event loop.
+    httpx clients stay bound to the loop that first used them, so each loop gets its own.
+    :return: An httpx.AsyncClient
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        import httpx
+        client = _clients[loop] = httpx.AsyncClient(
+            http2=HTTP2 and importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_POOL_SIZE if HTTP_KEEPALIVE else 0,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=HTTP_TIMEOUT
+        )
+    return client
+
+
+async def close_async_client():
+    # Closes the running loop's client; call it before that loop shuts down
+    import asyncio
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
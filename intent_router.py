@@ -0,0 +1,130 @@
+import os
+import re
+import json
+import time
+import threading
+
+# Routes below this confidence fall back to the LLM
+ROUTER_MIN_CONFIDENCE = float(os.getenv("ROUTER_MIN_CONFIDENCE", "0.9"))
+
+ISSUE_KEY = r"(?P<issue_id>[A-Za-z][A-Za-z0-9]+-\d+)"
+PROJECT_KEY = r"(?P<project>[A-Za-z][A-Za-z0-9]+)"
+TAGS = r"(?P<tags>(?:\s+[\w.\-/]+:[\w.\-/]+)*)"
+
+# (tool name, pattern, argument builder); patterns are matched case-insensitively
+RULES = [
+    (
+        "get_issue",
+        rf"(?:get|show|fetch|view|open)\s+(?:issue\s+)?{ISSUE_KEY}",
+        lambda m: {"issue_id": m["issue_id"].upper()}
+    ),
+    (
+        "get_issue_comments",
+        rf"(?:get|show|list)\s+(?:the\s+)?comments\s+(?:on|for|of)\s+(?:issue\s+)?{ISSUE_KEY}",
+        lambda m: {"issue_id": m["issue_id"].upper()}
+    ),
+    (
+        "get_issue_transitions",
+        rf"(?:get|show|list)\s+(?:the\s+)?transitions\s+(?:on|for|of)\s+(?:issue\s+)?{ISSUE_KEY}",
+        lambda m: {"issue_id": m["issue_id"].upper()}
+    ),
+    (
+        "transition_issue",
+        # Anchored at the end: on a partial (search) match the lazy status would stop after one character
+        rf"(?:transition|move)\s+(?:issue\s+)?{ISSUE_KEY}\s+to\s+[\"']?(?P<status>[\w ]+?)[\"']?$",
+        lambda m: {"issue_id": m["issue_id"].upper(), "status": m["status"].strip()}
+    ),
+    (
+        "get_issues",
+        rf"(?:get|show|list)\s+(?:all\s+)?issues\s+(?:in|for|from)\s+(?:project\s+)?{PROJECT_KEY}",
+        lambda m: {"project": m["project"].upper()}
+    ),
+    (
+        "send_custom_metric",
+        rf"send\s+metric\s+(?P<metric_name>[\w.]+)\s+(?P<value>-?\d+(?:\.\d+)?){TAGS}",
+        lambda m: {
+            "metric_name": m["metric_name"],
+            "value": float(m["value"]),
+            "tags": m["tags"].split(),
+            "metric_type": "gauge"
+        }
+    ),
+    (
+        "send_service_check",
+        rf"send\s+service\s+check\s+(?P<check_name>[\w.]+)\s+(?P<status>ok|warning|critical|unknown){TAGS}",
+        lambda m: {
+            "check_name": m["check_name"],
+            "status": ["ok", "warning", "critical", "unknown"].index(m["status"].lower()),
+            "tags": m["tags"].split()
+        }
+    ),
+]
+
+COMPILED_RULES = [(name, re.compile(pattern, re.IGNORECASE), build) for name, pattern, build in RULES]
+
+
+class IntentRouter:
+    """
+    Maps structured prompts straight to tool calls, skipping the LLM.
+
+    A rule matching the whole prompt is confident; a rule matching only part
+    of a longer prompt is not, and the prompt goes to the model instead.
+    """
+
+    def __init__(self, rules=COMPILED_RULES, min_confidence=ROUTER_MIN_CONFIDENCE):
+        self.rules = rules
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self._stats = {"routed": 0, "fallbacks": 0, "routing_seconds": 0.0, "llm_seconds": 0.0, "llm_calls": 0}
+
+    def match(self, prompt):
+        """
+        Finds the best rule for a prompt.
+        :param prompt: The user prompt
+        :return: (tool name, arguments, confidence), or None
+        """
+        text = prompt.strip().rstrip(".!?")
+        best = None
+        for name, pattern, build in self.rules:
+            match = pattern.fullmatch(text)
+            if match:
+                return name, build(match), 1.0
+            match = pattern.search(text)
+            if match and best is None:
+                best = (name, build(match), 0.5)
+        return best
+
+    def route(self, prompt):
+        """
+        Returns tool calls for a prompt when the router is confident enough.
+        :param prompt: The user prompt
+        :return: A list of {"name", "arguments"} dicts, or None to use the LLM
+        """
+        start = time.perf_counter()
+        match = self.match(prompt)
+        routed = match is not None and match[2] >= self.min_confidence
+        with self._lock:
+            self._stats["routing_seconds"] += time.perf_counter() - start
+            self._stats["routed" if routed else "fallbacks"] += 1
+        if not routed:
+            return None
+        name, args, _ = match
+        return [{"name": name, "arguments": json.dumps(args)}]
+
+    def record_llm_latency(self, seconds):
+        with self._lock:
+            self._stats["llm_seconds"] += seconds
+            self._stats["llm_calls"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats["routed"] + stats["fallbacks"]
+        average_llm = stats["llm_seconds"] / stats["llm_calls"] if stats["llm_calls"] else 0.0
+        stats["hit_rate"] = stats["routed"] / total if total else 0.0
+        # Each routed prompt skips at least one LLM round trip
+        stats["estimated_seconds_saved"] = stats["routed"] * average_llm - stats["routing_seconds"]
+        return stats
+
+
+router = IntentRouter()
@@ -0,0 +1,195 @@
+import os
+import re
+import sys
+import sqlite3
+import argparse
+import threading
+
+# Local full-text index over issue summaries, descriptions and comments; defaults to the mirror's file
+JIRA_INDEX_PATH = os.getenv("JIRA_INDEX_PATH", os.getenv("JIRA_MIRROR_PATH"))  # unset disables the index
+# create_issue looks for likely duplicates first and creates nothing if it finds any (unless force=true)
+JIRA_DUPLICATE_CHECK = os.getenv("JIRA_DUPLICATE_CHECK", "false").lower() in ("1", "true", "yes")
+# Share of summary words two issues must have in common to count as duplicates
+JIRA_DUPLICATE_THRESHOLD = float(os.getenv("JIRA_DUPLICATE_THRESHOLD", "0.5"))
+
+# BM25 column weights: summary, description, comments
+COLUMN_WEIGHTS = (3.0, 1.0, 0.5)
+# Query words beyond this are ignored; long descriptions otherwise match the whole index
+MAX_QUERY_TERMS = 32
+
+WORD_PATTERN = re.compile(r"\w+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "that", "the", "this", "to", "was", "when", "with", "we", "i", "not", "no", "but", "can", "should"
+}
+
+
+def _terms(text):
+    seen = []
+    for word in WORD_PATTERN.findall((text or "").lower()):
+        if word not in STOPWORDS and word not in seen:
+            seen.append(word)
+    return seen
+
+
+class IssueIndex:
+    """
+    Inverted index over issue text, ranked with BM25 (SQLite FTS5).
+
+    Rows are upserted one issue at a time as the mirror syncs and as the
+    tools read or write issues, so the index never needs a rebuild. A None
+    field leaves the indexed text unchanged, which lets partial updates and
+    comment listings refresh just their own column.
+    """
+
+    def __init__(self, path=JIRA_INDEX_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS issue_docs ("
+            "rowid INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, project TEXT NOT NULL, "
+            "summary TEXT, description TEXT, comments TEXT);"
+            "CREATE INDEX IF NOT EXISTS issue_docs_project ON issue_docs (project);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS issue_text USING fts5("
+            "summary, description, comments, content='issue_docs', content_rowid='rowid', "
+            "tokenize='porter unicode61');"
+            # Keep the external-content FTS table in step with issue_docs
+            "CREATE TRIGGER IF NOT EXISTS issue_docs_ai AFTER INSERT ON issue_docs BEGIN "
+            "INSERT INTO issue_text (rowid, summary, description, comments) "
+            "VALUES (new.rowid, new.summary, new.description, new.comments); END;"
+            "CREATE TRIGGER IF NOT EXISTS issue_docs_ad AFTER DELETE ON issue_docs BEGIN "
+            "INSERT INTO issue_text (issue_text, rowid, summary, description, comments) "
+            "VALUES ('delete', old.rowid, old.summary, old.description, old.comments); END;"
+            "CREATE TRIGGER IF NOT EXISTS issue_docs_au AFTER UPDATE ON issue_docs BEGIN "
+            "INSERT INTO issue_text (issue_text, rowid, summary, description, comments) "
+            "VALUES ('delete', old.rowid, old.summary, old.description, old.comments); "
+            "INSERT INTO issue_text (rowid, summary, description, comments) "
+            "VALUES (new.rowid, new.summary, new.description, new.comments); END;"
+        )
+        self._db.commit()
+
+    def add(self, issues):
+        """
+        Indexes or re-indexes issues.
+        :param issues: Dicts with "key" and any of "summary", "description" and "comments" (a list of bodies)
+        """
+        rows = [
+            (issue["key"].upper(), issue["key"].rsplit("-", 1)[0].upper(), issue.get("summary"),
+             issue.get("description"),
+             None if issue.get("comments") is None else "\n".join(body or "" for body in issue["comments"]))
+            for issue in issues if "-" in (issue.get("key") or "")
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO issue_docs (key, project, summary, description, comments) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "summary = COALESCE(excluded.summary, summary), "
+                "description = COALESCE(excluded.description, description), "
+                "comments = COALESCE(excluded.comments, comments)",
+                rows
+            )
+            self._db.commit()
+
+    def remove(self, keys):
+        with self._lock:
+            self._db.executemany("DELETE FROM issue_docs WHERE key = ?", [(key.upper(),) for key in keys])
+            self._db.commit()
+
+    def search(self, query, project=None, limit=10):
+        """
+        Ranks indexed issues against free text.
+        :param query: Free text; any word may match
+        :param project: Optional project key to search within
+        :param limit: Maximum number of matches
+        :return: [{"key", "summary", "score"}], best first
+        """
+        terms = _terms(query)[:MAX_QUERY_TERMS]
+        if not terms:
+            return []
+        match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        rank = f"bm25(issue_text, {', '.join(map(str, COLUMN_WEIGHTS))})"
+        sql = (
+            f"SELECT d.key, d.summary, {rank} FROM issue_text JOIN issue_docs d ON d.rowid = issue_text.rowid "
+            "WHERE issue_text MATCH ?" + (" AND d.project = ?" if project else "") + f" ORDER BY {rank} LIMIT ?"
+        )
+        params = [match] + ([project.upper()] if project else []) + [limit]
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        # FTS5 scores are negative, lower is better
+        return [{"key": key, "summary": summary, "score": round(-score, 3)} for key, summary, score in rows]
+
+    def duplicates(self, project, summary, description=None, limit=3, threshold=JIRA_DUPLICATE_THRESHOLD):
+        """
+        Finds existing issues that look like the one about to be created.
+        :param project: The project key
+        :param summary: The new issue's summary
+        :param description: The new issue's description
+        :param limit: Maximum number of duplicates returned
+        :param threshold: Minimum share of summary words in common
+        :return: [{"key", "summary", "score", "similarity"}], most similar first
+        """
+        # BM25 picks the candidates; summary word overlap decides, since BM25 scores have no fixed scale
+        words = set(_terms(summary))
+        if not words:
+            return []
+        found = []
+        for candidate in self.search(f"{summary} {description or ''}", project, limit=10):
+            other = set(_terms(candidate["summary"]))
+            similarity = len(words & other) / len(words | other) if other else 0.0
+            if similarity >= threshold:
+                found.append(dict(candidate, similarity=round(similarity, 2)))
+        found.sort(key=lambda candidate: (-candidate["similarity"], -candidate["score"]))
+        return found[:limit]
+
+    def status(self):
+        with self._lock:
+            rows = self._db.execute("SELECT project, COUNT(*) FROM issue_docs GROUP BY project").fetchall()
+        return dict(rows)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if not JIRA_INDEX_PATH:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = IssueIndex()
+    return _index
+
+
+def find_duplicates(project, summary, description=None):
+    # Pre-create check; empty when the check or the index is off
+    index = get_index()
+    if not JIRA_DUPLICATE_CHECK or index is None:
+        return []
+    return index.duplicates(project, summary, description)
+
+
+def main_index():
+    parser = argparse.ArgumentParser(description="Search the local issue index.")
+    parser.add_argument("query", nargs="?", help="Free text to search for; omit to show index status")
+    parser.add_argument("--project", help="Only search this project")
+    parser.add_argument("--limit", type=int, default=10)
+    options = parser.parse_args()
+
+    index = get_index()
+    if index is None:
+        print("[ERROR] Set JIRA_INDEX_PATH or JIRA_MIRROR_PATH to enable the issue index.")
+        sys.exit(1)
+
+    if not options.query:
+        for project, count in index.status().items():
+            print(f"[INFO] {project}: {count} issues indexed")
+        return
+    for match in index.search(options.query, options.project, options.limit):
+        print(f"{match['score']:>8.2f}  {match['key']:<12} {match['summary']}")
+
+
+if __name__ == "__main__":
+    main_index()
@@ -0,0 +1,138 @@
+import os
+import sys
+import csv
+import json
+import argparse
+
+# How tool results are printed: json (indented, the default), ndjson (one item per line) or csv
+AGENT_OUTPUT_FORMAT = os.getenv("AGENT_OUTPUT_FORMAT", "json").lower()
+OUTPUT_FORMATS = ("json", "ndjson", "csv")
+# Lines written between flushes, so output shows up while a listing is still being fetched
+OUTPUT_FLUSH_EVERY = int(os.getenv("OUTPUT_FLUSH_EVERY", "100"))
+
+
+class IssueRecord:
+    """
+    Compact issue for listings: slotted, with interned issue type names.
+
+    Well under half the size of the equivalent dict. Reads like a
+    read-only dict (record["key"], record.get("summary")), so code written
+    against issue dicts keeps working; json_default() serializes it.
+    """
+
+    FIELDS = ("id", "key", "summary", "description", "type")
+    __slots__ = FIELDS
+
+    def __init__(self, id, key, summary, description, type):
+        self.id = id
+        self.key = key
+        self.summary = summary
+        self.description = description
+        # A project has a handful of issue types shared by thousands of issues
+        self.type = sys.intern(type) if type else type
+
+    def __getitem__(self, name):
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def get(self, name, default=None):
+        return getattr(self, name) if name in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __eq__(self, other):
+        return isinstance(other, IssueRecord) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"IssueRecord({self.key!r}, {self.summary!r})"
+
+
+def json_default(value):
+    # Pass as json.dumps(..., default=json_default) wherever tool results are serialized
+    if isinstance(value, IssueRecord):
+        return value.to_dict()
+    return str(value)
+
+
+def _items(result):
+    # The list a tool result wraps ("issues", "comments", "results", ...); other results are one item
+    if isinstance(result, dict):
+        for value in result.values():
+            if isinstance(value, list):
+                return value
+        return [result]
+    return [result] if isinstance(result, (str, bytes)) else result
+
+
+def _row(item):
+    item = item.to_dict() if isinstance(item, IssueRecord) else item
+    return item if isinstance(item, dict) else {"value": item}
+
+
+def write_ndjson(items, stream):
+    for count, item in enumerate(items, 1):
+        stream.write(json.dumps(item, default=json_default) + "\n")
+        if count % OUTPUT_FLUSH_EVERY == 0:
+            stream.flush()
+    stream.flush()
+
+
+def write_csv(items, stream):
+    writer = None
+    for count, item in enumerate(items, 1):
+        row = _row(item)
+        if writer is None:
+            # Columns come from the first item; issue records always have the same ones
+            writer = csv.DictWriter(stream, fieldnames=list(row), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow({
+            name: json.dumps(value, default=json_default) if isinstance(value, (dict, list)) else value
+            for name, value in row.items()
+        })
+        if count % OUTPUT_FLUSH_EVERY == 0:
+            stream.flush()
+    stream.flush()
+
+
+def write_result(result, stream=None, output_format=AGENT_OUTPUT_FORMAT):
+    """
+    Prints a tool result without building the whole text in memory first.
+    :param result: A tool result, or an iterable of issues
+    :param stream: Where to write (stdout by default)
+    :param output_format: "json", "ndjson" or "csv"
+    """
+    stream = stream or sys.stdout
+    if output_format == "ndjson":
+        write_ndjson(_items(result), stream)
+    elif output_format == "csv":
+        write_csv(_items(result), stream)
+    else:
+        # json.dump writes chunk by chunk, unlike print(json.dumps(...))
+        json.dump(result, stream, indent=2, default=json_default)
+        stream.write("\n")
+
+
+def main_export():
+    parser = argparse.ArgumentParser(description="Stream every issue in a Jira project as NDJSON or CSV.")
+    parser.add_argument("project", help="The project key")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--output", help="File to write (defaults to stdout)")
+    options = parser.parse_args()
+
+    import jira_functions
+    stream = open(options.output, "w", encoding="utf-8", newline="") if options.output else sys.stdout
+    try:
+        # One page of issues in memory at a time, whatever the project size
+        write_result(jira_functions.iter_issue_records(options.project), stream, options.format)
+    finally:
+        if options.output:
+            stream.close()
+
+
+if __name__ == "__main__":
+    main_export()
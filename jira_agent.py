@@ -4,10 +4,9 @@ from dotenv import load_dotenv
 from atlassian import Jira
 import json, sys
 from openai import OpenAI
-from jira_functions import create_issue, update_issue, delete_issue, get_issue, get_issues, get_issue_comments, transition_issue, send_latency_metric
-import tensorflow_probability as tfp
-
-tfd = tfp.distributions
+from jira_functions import create_issue, update_issue, delete_issue, get_issue, get_issues, get_issue_comments, transition_issue
+from datadog_functions import send_latency_metric
+from http_pool import create_session
 
 # Load environment variables from .env file
 load_dotenv('.env')
@@ -22,7 +21,7 @@ JIRA_USERNAME = os.environ.get("JIRA_USERNAME")
 JIRA_API_TOKEN = os.environ.get("JIRA_API_TOKEN")
 
 
-jira = Jira(url=JIRA_URL, username=JIRA_USERNAME, password=JIRA_API_TOKEN)
+jira = Jira(url=JIRA_URL, username=JIRA_USERNAME, password=JIRA_API_TOKEN, session=create_session())
 
 
 client = OpenAI(
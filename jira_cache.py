@@ -0,0 +1,181 @@
+import os
+import copy
+import asyncio
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Cache configuration
+JIRA_CACHE_SIZE = int(os.getenv("JIRA_CACHE_SIZE", "1024"))
+JIRA_CACHE_PATH = os.getenv("JIRA_CACHE_PATH")  # e.g. .jira_cache.sqlite3; unset keeps the cache in memory only
+JIRA_CACHE_TTLS = {
+    "issue": float(os.getenv("JIRA_CACHE_TTL_ISSUE", "60")),
+    "comments": float(os.getenv("JIRA_CACHE_TTL_COMMENTS", "60")),
+    "transitions": float(os.getenv("JIRA_CACHE_TTL_TRANSITIONS", "3600")),
+}
+
+
+class CacheEntry:
+    __slots__ = ("value", "version", "stored_at")
+
+    def __init__(self, value, version, stored_at):
+        self.value = value
+        self.version = version
+        self.stored_at = stored_at
+
+
+class MemoryStore:
+    """Thread-safe LRU store bounded by entry count."""
+
+    def __init__(self, max_entries=JIRA_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SqliteStore:
+    """On-disk store so cached reads survive across CLI runs."""
+
+    def __init__(self, path=JIRA_CACHE_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, version TEXT, stored_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, version, stored_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def set(self, key, entry):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, version, stored_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(entry.value), entry.version, entry.stored_at)
+            )
+            self._db.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._db.commit()
+
+
+class IssueCache:
+    """
+    Read-through cache for per-issue Jira resources.
+
+    Stores are checked in order (fastest first). Entries older than their
+    resource TTL are revalidated against the issue's `updated` timestamp
+    before being refetched.
+    """
+
+    def __init__(self, stores, ttls=None):
+        self.stores = stores
+        self.ttls = dict(JIRA_CACHE_TTLS, **(ttls or {}))
+
+    @classmethod
+    def from_env(cls):
+        stores = [MemoryStore()]
+        if JIRA_CACHE_PATH:
+            stores.append(SqliteStore(JIRA_CACHE_PATH))
+        return cls(stores)
+
+    def _lookup(self, key):
+        for index, store in enumerate(self.stores):
+            entry = store.get(key)
+            if entry is not None:
+                # Promote to the faster tiers
+                for faster in self.stores[:index]:
+                    faster.set(key, entry)
+                return entry
+        return None
+
+    def _store(self, key, entry):
+        for store in self.stores:
+            store.set(key, entry)
+
+    def read(self, resource, issue_key, fetch, revalidate=None):
+        """
+        Returns a cached resource, fetching it on a miss.
+        :param resource: The resource name ("issue", "comments" or "transitions")
+        :param issue_key: The issue key the resource belongs to
+        :param fetch: Callable returning (value, version); version may be None
+        :param revalidate: Callable returning the issue's current version
+        :return: A copy of the cached value
+        """
+        key = f"{resource}:{issue_key}"
+        entry = self._lookup(key)
+        now = time.time()
+
+        if entry is not None and now - entry.stored_at < self.ttls[resource]:
+            return copy.deepcopy(entry.value)
+
+        current_version = None
+        if entry is not None and revalidate is not None:
+            current_version = revalidate()
+            if entry.version is not None and current_version == entry.version:
+                self._store(key, CacheEntry(entry.value, entry.version, now))
+                return copy.deepcopy(entry.value)
+
+        value, version = fetch()
+        self._store(key, CacheEntry(value, version or current_version, now))
+        return copy.deepcopy(value)
+
+    async def _off_loop(self, func, *args):
+        # SQLite stores block; keep them off the event loop (the memory store alone is not worth a thread hop)
+        if any(isinstance(store, SqliteStore) for store in self.stores):
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def aread(self, resource, issue_key, fetch, revalidate=None):
+        """Async counterpart of read(); fetch and revalidate are coroutine functions."""
+        key = f"{resource}:{issue_key}"
+        entry = await self._off_loop(self._lookup, key)
+        now = time.time()
+
+        if entry is not None and now - entry.stored_at < self.ttls[resource]:
+            return copy.deepcopy(entry.value)
+
+        current_version = None
+        if entry is not None and revalidate is not None:
+            current_version = await revalidate()
+            if entry.version is not None and current_version == entry.version:
+                await self._off_loop(self._store, key, CacheEntry(entry.value, entry.version, now))
+                return copy.deepcopy(entry.value)
+
+        value, version = await fetch()
+        await self._off_loop(self._store, key, CacheEntry(value, version or current_version, now))
+        return copy.deepcopy(value)
+
+    def invalidate(self, issue_key):
+        for resource in self.ttls:
+            for store in self.stores:
+                store.delete(f"{resource}:{issue_key}")
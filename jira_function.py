@@ -1,14 +1,43 @@
 from jira import JIRA
 from langchain_core.tools import tool
 from dotenv import load_dotenv
+from itertools import islice
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 import os
+from jira_pagination import paginate, JIRA_PAGE_SIZE, JIRA_PREFETCH_PAGES
+from http_pool import mount
+from jira_mirror import get_mirror, reads_from_mirror
+from issue_index import get_index
+from jira_workflows import project_of
 load_dotenv('.env')
 
 JIRA_URL = os.environ.get("JIRA_INSTANCE_URL")
 JIRA_USERNAME = os.environ.get("JIRA_USERNAME")
 JIRA_API_TOKEN = os.environ.get("JIRA_API_TOKEN")
 
-jira = JIRA(url=JIRA_URL, username=JIRA_USERNAME, password=JIRA_API_TOKEN)
+jira = JIRA(server=JIRA_URL, basic_auth=(JIRA_USERNAME, JIRA_API_TOKEN))
+# JIRA builds its own session; route it through the shared connection pool
+mount(jira._session)
+
+# Only the fields we map into issue dicts are requested from Jira
+ISSUE_FIELDS = "summary,description,issuetype"
+
+# Bulk operation limits (Jira accepts at most 50 issues per bulk create request)
+JIRA_BULK_CHUNK_SIZE = int(os.environ.get("JIRA_BULK_CHUNK_SIZE", "50"))
+JIRA_BULK_WORKERS = int(os.environ.get("JIRA_BULK_WORKERS", "4"))
+
+def _mirror_changed(issue_id=None, project=None):
+    # After a write, the next mirrored read of the project syncs first
+    mirror = get_mirror()
+    if mirror is not None and (issue_id or project):
+        mirror.changed(issue_id, project)
+
+def _index(issues):
+    # Feed issues we have just read or written into the full-text index
+    index = get_index()
+    if index is not None:
+        index.add(issues)
 
 @tool
 def create_issue(summary: str, description: str, issue_type: str) -> dict:
@@ -28,6 +57,8 @@ def create_issue(summary: str, description: str, issue_type: str) -> dict:
                 "issuetype": {"name": issue_type}
             }
         )
+        _mirror_changed(project=os.environ.get('JIRA_PROJECT_KEY'))
+        _index([{"key": new_issue.key, "summary": summary, "description": description}])
     except Exception as e:
         return {
             "error": str(e)
@@ -61,6 +92,8 @@ def update_issue(issue_id: str, summary: str, description: str, issue_type: str)
         }
 
         issue.update(fields=fields)
+        _mirror_changed(issue.key)
+        _index([_to_dict(issue)])
     except Exception as e:
         return {
             "error": str(e)
@@ -82,6 +115,10 @@ def delete_issue(issue_id: str) -> dict:
     """
     try:
         jira.issue(issue_id).delete()
+        if get_mirror() is not None:
+            get_mirror().remove(issue_id)
+        elif get_index() is not None:
+            get_index().remove([issue_id])
     except Exception as e:
         return {
             "error": str(e)
@@ -99,7 +136,13 @@ def get_issue(issue_id: str) -> dict:
     :return: The issue
     """
     try:
+        if "-" in issue_id and reads_from_mirror(project_of(issue_id)):
+            get_mirror().ensure_fresh(project_of(issue_id), search_for_mirror)
+            mirrored = get_mirror().issue(issue_id)
+            if mirrored is not None:
+                return mirrored
         issue = jira.issue(issue_id)
+        _index([_to_dict(issue)])
     except Exception as e:
         return {
             "error": str(e)
@@ -113,30 +156,96 @@ def get_issue(issue_id: str) -> dict:
         "type": issue.fields.issuetype.name
     }
 
+def iter_issues(project: str, page_size: int = JIRA_PAGE_SIZE, prefetch: int = JIRA_PREFETCH_PAGES):
+    """
+    Yields all issues in a project, one page in memory at a time.
+    :param project: The project key
+    :param page_size: Number of issues requested per page
+    :param prefetch: Number of upcoming pages fetched in parallel
+    :return: A generator of issue dicts
+    """
+    for issue in _search(f"project={project} ORDER BY key ASC", ISSUE_FIELDS, page_size, prefetch):
+        yield _to_dict(issue)
+
+def _search(jql, fields, page_size=JIRA_PAGE_SIZE, prefetch=JIRA_PREFETCH_PAGES):
+    def fetch_page(start, limit):
+        page = jira.search_issues(jql, startAt=start, maxResults=limit, fields=fields)
+        return page, page.total
+
+    return paginate(fetch_page, page_size, prefetch)
+
+def _to_dict(issue):
+    return {
+        "id": issue.id,
+        "key": issue.key,
+        "summary": issue.fields.summary,
+        "description": issue.fields.description,
+        "type": issue.fields.issuetype.name
+    }
+
+def _comment_bodies(issue):
+    # None when comments were not requested, so the index keeps what it has
+    comment = getattr(issue.fields, "comment", None)
+    return None if comment is None else [c.body for c in comment.comments]
+
+def search_for_mirror(jql: str):
+    """
+    Yields issues matching a JQL query in the shape the local mirror stores.
+    :param jql: The JQL query
+    :return: A generator of issue dicts including "updated" and, when the index is on, "comments"
+    """
+    fields = ISSUE_FIELDS + ",updated" + (",comment" if get_index() is not None else "")
+    for issue in _search(jql, fields):
+        yield dict(_to_dict(issue), updated=issue.fields.updated, comments=_comment_bodies(issue))
+
 @tool
-def get_issues(project: str) -> dict:
+def get_issues(project: str, limit: Optional[int] = None) -> dict:
     """
     Gets all issues in a project.
     :param project: The project key
+    :param limit: Maximum number of issues to return
     :return: The issues
     """
     try:
-        issues = jira.search_issues(f"project={project}")
+        if reads_from_mirror(project):
+            get_mirror().ensure_fresh(project, search_for_mirror)
+            # The mirror hands out compact records; tools return plain dicts
+            issues = [record.to_dict() for record in get_mirror().issues(project, limit)]
+        else:
+            issues = list(islice(iter_issues(project), limit))
+            _index(issues)
     except Exception as e:
         return {
             "error": str(e)
         }
 
     return {
-        "issues": [
-            {
-                "id": issue.id,
-                "key": issue.key,
-                "summary": issue.fields.summary,
-                "description": issue.fields.description,
-                "type": issue.fields.issuetype.name
-            } for issue in issues
-        ]
+        "issues": issues
+    }
+
+@tool
+def search_issues(query: str, limit: int = 10) -> dict:
+    """
+    Searches issue summaries, descriptions and comments in the local full-text index.
+    Use it to look for an existing ticket before creating one.
+    :param query: Free text describing the issue
+    :param limit: Maximum number of matches
+    :return: The best matching issues with their scores
+    """
+    try:
+        index = get_index()
+        if index is None:
+            return {
+                "error": "The issue index is off; set JIRA_INDEX_PATH or JIRA_MIRROR_PATH"
+            }
+        issues = index.search(query, os.environ.get('JIRA_PROJECT_KEY'), limit)
+    except Exception as e:
+        return {
+            "error": str(e)
+        }
+
+    return {
+        "issues": issues
     }
 
 @tool
@@ -148,6 +257,7 @@ def get_issue_comments(issue_id: str) -> dict:
     """
     try:
         comments = jira.comments(issue_id)
+        _index([{"key": issue_id, "comments": [comment.body for comment in comments]}])
     except Exception as e:
         return {
             "error": str(e)
@@ -195,6 +305,7 @@ def transition_issue(issue_id: str, transition_id: str) -> dict:
     """
     try:
         jira.transition_issue(issue_id, transition_id)
+        _mirror_changed(issue_id)
     except Exception as e:
         return {
             "error": str(e)
@@ -203,3 +314,104 @@ def transition_issue(issue_id: str, transition_id: str) -> dict:
     return {
         "message": "Issue transitioned successfully"
     }
+
+@tool
+def bulk_create_issues(issues: list[dict]) -> dict:
+    """
+    Creates many Jira issues using Jira's bulk create endpoint.
+    :param issues: Dicts with summary, description and issue_type
+    :return: One result per issue, in input order
+    """
+    results = []
+    for start in range(0, len(issues), JIRA_BULK_CHUNK_SIZE):
+        chunk = issues[start:start + JIRA_BULK_CHUNK_SIZE]
+        field_list = [
+            {
+                "project": {"key": os.environ.get('JIRA_PROJECT_KEY')},
+                "summary": item["summary"],
+                "description": item.get("description", ""),
+                "issuetype": {"name": item["issue_type"]}
+            } for item in chunk
+        ]
+        try:
+            # The JIRA client's session already waits out HTTP 429 responses
+            created = jira.create_issues(field_list, prefetch=False)
+        except Exception as e:
+            results.extend({"error": str(e)} for _ in chunk)
+            continue
+        _mirror_changed(project=os.environ.get('JIRA_PROJECT_KEY'))
+
+        for item in created:
+            if item["status"] == "Success":
+                results.append({"id": item["issue"].id, "key": item["issue"].key})
+            else:
+                results.append({"error": str(item["error"])})
+
+    return {
+        "results": [dict(result, index=index) for index, result in enumerate(results)]
+    }
+
+def _update_one(item: dict) -> dict:
+    try:
+        issue = jira.issue(item["issue_id"])
+        fields = {}
+        if item.get("summary"):
+            fields["summary"] = item["summary"]
+        if item.get("description"):
+            fields["description"] = item["description"]
+        if item.get("issue_type"):
+            fields["issuetype"] = {"name": item["issue_type"]}
+        issue.update(fields=fields)
+        _mirror_changed(issue.key)
+    except Exception as e:
+        return {
+            "error": str(e)
+        }
+
+    return {
+        "key": issue.key,
+        "message": "Issue updated successfully"
+    }
+
+def _transition_one(item: dict) -> dict:
+    try:
+        # transition_issue accepts a transition ID or name
+        jira.transition_issue(item["issue_id"], item.get("transition_id") or item["status"])
+        _mirror_changed(item["issue_id"])
+    except Exception as e:
+        return {
+            "error": str(e)
+        }
+
+    return {
+        "key": item["issue_id"],
+        "message": "Issue transitioned successfully"
+    }
+
+@tool
+def bulk_update_issues(updates: list[dict]) -> dict:
+    """
+    Updates many Jira issues in parallel.
+    :param updates: Dicts with issue_id and the summary, description or issue_type to change
+    :return: One result per issue, in input order
+    """
+    with ThreadPoolExecutor(max_workers=JIRA_BULK_WORKERS) as pool:
+        results = list(pool.map(_update_one, updates))
+
+    return {
+        "results": [dict(result, index=index) for index, result in enumerate(results)]
+    }
+
+@tool
+def bulk_transition_issues(transitions: list[dict]) -> dict:
+    """
+    Transitions many Jira issues in parallel.
+    :param transitions: Dicts with issue_id and a target status or transition_id
+    :return: One result per issue, in input order
+    """
+    with ThreadPoolExecutor(max_workers=JIRA_BULK_WORKERS) as pool:
+        results = list(pool.map(_transition_one, transitions))
+
+    return {
+        "results": [dict(result, index=index) for index, result in enumerate(results)]
+    }
@@ -1,6 +1,18 @@
 from atlassian import Jira
 from dotenv import load_dotenv
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 import os
+import sys
+from jira_pagination import paginate, JIRA_PAGE_SIZE, JIRA_PREFETCH_PAGES
+from jira_cache import IssueCache
+from jira_workflows import WorkflowIndex, project_of
+from jira_mirror import get_mirror, reads_from_mirror
+from issue_index import get_index, find_duplicates
+from issue_records import IssueRecord, write_result
+from requests.exceptions import HTTPError
+from retry import call_with_retry
+from http_pool import create_session
 
 # Load environment variables
 load_dotenv('.env')
@@ -10,18 +22,97 @@ JIRA_URL = os.environ.get("JIRA_INSTANCE_URL")
 JIRA_USERNAME = os.environ.get("JIRA_USERNAME")
 JIRA_API_TOKEN = os.environ.get("JIRA_API_TOKEN")
 
-# Connect to Jira
-jira = Jira(url=JIRA_URL, username=JIRA_USERNAME, password=JIRA_API_TOKEN)
+# Bulk operation limits (Jira accepts at most 50 issues per bulk create request)
+JIRA_BULK_CHUNK_SIZE = int(os.getenv("JIRA_BULK_CHUNK_SIZE", "50"))
+JIRA_BULK_WORKERS = int(os.getenv("JIRA_BULK_WORKERS", "4"))
+# Issues handed to the model when a listing is streamed to the output instead of returned whole
+JIRA_STREAM_KEEP = int(os.getenv("JIRA_STREAM_KEEP", "50"))
 
-def create_issue(project: str, summary: str, description: str, issue_type: str) -> dict:
+# Connect to Jira over the shared connection pool
+jira = Jira(url=JIRA_URL, username=JIRA_USERNAME, password=JIRA_API_TOKEN, session=create_session())
+
+# Only the fields we map into issue dicts are requested from Jira
+ISSUE_FIELDS = ["summary", "description", "issuetype"]
+
+# Cache for issue, comment and transition reads; writes below invalidate it
+issue_cache = IssueCache.from_env()
+
+# Status name -> transition ID per project and issue type, learned from transition listings
+workflow_index = WorkflowIndex()
+
+def _to_dict(issue):
+    return {
+        "id": issue["id"],
+        "key": issue["key"],
+        "summary": issue["fields"]["summary"],
+        "description": issue["fields"]["description"],
+        "type": issue["fields"]["issuetype"]["name"]
+    }
+
+def _to_record(issue):
+    fields = issue["fields"]
+    return IssueRecord(issue["id"], issue["key"], fields["summary"], fields["description"], fields["issuetype"]["name"])
+
+def _comment_bodies(issue):
+    # None when comments were not requested, so the index keeps what it has
+    comment = issue["fields"].get("comment")
+    return None if comment is None else [c.get("body") for c in comment.get("comments", [])]
+
+def _index(issues):
+    # Feed issues we have just read or written into the full-text index
+    index = get_index()
+    if index is not None:
+        index.add(issues)
+
+def _invalidate(key, project=None):
+    # After a write: drop cached reads and make the next mirrored read sync first
+    if key:
+        issue_cache.invalidate(key)
+    mirror = get_mirror()
+    if mirror is not None:
+        mirror.changed(key, project)
+
+def _remove(key):
+    # After a delete: drop cached reads, the mirrored row and the index entry
+    issue_cache.invalidate(key)
+    if get_mirror() is not None:
+        get_mirror().remove(key)
+    elif get_index() is not None:
+        get_index().remove([key])
+
+def _duplicates_of(project, summary, description):
+    # create_issue's pre-create check, as a tool result; None when nothing looks alike
+    duplicates = find_duplicates(project, summary, description)
+    if not duplicates:
+        return None
+    return {
+        "duplicates": duplicates,
+        "message": "Possible duplicates found, nothing was created. Call create_issue with force=true to create it anyway."
+    }
+
+def _created(items):
+    # After a create: index the new issues and remember their types for transitions
+    _index([{"key": item["key"], "summary": item["summary"], "description": item.get("description")} for item in items])
+    for item in items:
+        workflow_index.note_type(item["key"], item["issue_type"])
+
+def _issue_version(key):
+    return call_with_retry("jira", jira.issue, key, fields="updated")["fields"].get("updated")
+
+def create_issue(project: str, summary: str, description: str, issue_type: str, force: bool = False) -> dict:
     print("New issue is being created")
     try:
-        new_issue = jira.issue_create(fields={
+        duplicates = None if force else _duplicates_of(project, summary, description)
+        if duplicates:
+            return duplicates
+        new_issue = call_with_retry("jira", jira.issue_create, idempotent=False, fields={
             "project": {"key": project},
             "summary": summary,
             "description": description,
             "issuetype": {"name": issue_type}
         })
+        _invalidate(None, project)
+        _created([{"key": new_issue.get("key"), "summary": summary, "description": description, "issue_type": issue_type}])
         return {
             "key": new_issue.get("key"),
             "id": new_issue.get("id"),
@@ -42,7 +133,10 @@ def update_issue(issue_id=None, issue_key=None, summary=None, description=None,
         if issue_type:
             fields["issuetype"] = {"name": issue_type}
 
-        jira.issue_update(key, fields=fields)
+        call_with_retry("jira", jira.issue_update, key, fields=fields)
+        _invalidate(key)
+        workflow_index.note_type(key, issue_type)
+        _index([{"key": key, "summary": summary, "description": description}])
         return {"message": f"Issue {key} updated successfully"}
     except Exception as e:
         return {"error": str(e)}
@@ -50,49 +144,124 @@ def update_issue(issue_id=None, issue_key=None, summary=None, description=None,
 def delete_issue(issue_id=None, issue_key=None) -> dict:
     key = issue_id or issue_key
     try:
-        jira.issue_delete(key)
+        call_with_retry("jira", jira.delete_issue, key)
+        _remove(key)
         return {"message": f"Issue {key} deleted successfully"}
     except Exception as e:
         return {"error": str(e)}
 
 def get_issue(issue_id=None, issue_key=None) -> dict:
     key = issue_id or issue_key
+    def fetch():
+        issue = call_with_retry("jira", jira.issue, key, fields=",".join(ISSUE_FIELDS + ["updated"]))
+        result = _to_dict(issue)
+        _index([result])
+        workflow_index.note_type(result["key"], result["type"])
+        return result, issue["fields"].get("updated")
+
     try:
-        issue = jira.issue(key)
-        return {
-            "id": issue.get("id"),
-            "key": issue.get("key"),
-            "summary": issue["fields"]["summary"],
-            "description": issue["fields"]["description"],
-            "type": issue["fields"]["issuetype"]["name"]
-        }
+        if "-" in key and reads_from_mirror(project_of(key)):
+            get_mirror().ensure_fresh(project_of(key), search_for_mirror)
+            mirrored = get_mirror().issue(key)
+            if mirrored is not None:
+                return mirrored
+        return issue_cache.read("issue", key, fetch, lambda: _issue_version(key))
     except Exception as e:
         return {"error": str(e)}
 
-def get_issues(project: str) -> dict:
+def _search(jql, fields=ISSUE_FIELDS, page_size=JIRA_PAGE_SIZE, prefetch=JIRA_PREFETCH_PAGES):
+    def fetch_page(start, limit):
+        response = call_with_retry("jira", jira.jql, jql, fields=fields, start=start, limit=limit)
+        return response["issues"], response.get("total")
+
+    return paginate(fetch_page, page_size, prefetch)
+
+def search_for_mirror(jql):
+    # Comments ride along when the full-text index is on
+    fields = ISSUE_FIELDS + ["updated"] + (["comment"] if get_index() is not None else [])
+    for issue in _search(jql, fields=fields):
+        yield dict(_to_dict(issue), updated=issue["fields"].get("updated"), comments=_comment_bodies(issue))
+
+def iter_issues(project: str, page_size=JIRA_PAGE_SIZE, prefetch=JIRA_PREFETCH_PAGES):
+    for issue in _search(f"project = {project} ORDER BY key ASC", page_size=page_size, prefetch=prefetch):
+        yield _to_record(issue)
+
+def iter_issue_records(project: str, page_size=JIRA_PAGE_SIZE, prefetch=JIRA_PREFETCH_PAGES):
+    # Streams a whole project for export, from the mirror when it serves the project
+    if reads_from_mirror(project):
+        get_mirror().ensure_fresh(project, search_for_mirror)
+        return get_mirror().iter_issues(project)
+    return iter_issues(project, page_size, prefetch)
+
+def get_issues(project: str, limit=None, page_size=JIRA_PAGE_SIZE) -> dict:
     print(f"Getting issues from project {project}")
     try:
-        response = jira.jql(f"project = {project}")
-        issues = response["issues"]
+        if reads_from_mirror(project):
+            get_mirror().ensure_fresh(project, search_for_mirror)
+            return {"issues": get_mirror().issues(project, limit)}
+        issues = list(islice(iter_issues(project, page_size), limit))
+        _index(issues)
+        return {"issues": issues}
+    except Exception as e:
+        return {"error": str(e)}
+
+def stream_issues(project: str, limit=None, output_format="ndjson", stream=None) -> dict:
+    """
+    get_issues for line-oriented output: writes issues as their pages arrive, like the export CLI.
+    :param project: The project key
+    :param limit: Maximum number of issues
+    :param output_format: "ndjson" or "csv"
+    :param stream: Where to write (stdout by default)
+    :return: The first JIRA_STREAM_KEEP issues and the number written
+    """
+    print(f"Streaming issues from project {project}")
+    kept = []
+    count = 0
+    mirrored = reads_from_mirror(project)
+
+    def tee(records):
+        nonlocal count
+        page = []
+        for record in records:
+            count += 1
+            if len(kept) < JIRA_STREAM_KEEP:
+                kept.append(record)
+            if not mirrored:
+                page.append(record)
+                if len(page) == JIRA_PAGE_SIZE:
+                    _index(page)
+                    page = []
+            yield record
+        _index(page)
+
+    try:
+        write_result(tee(islice(iter_issue_records(project), limit)), stream or sys.stdout, output_format)
         return {
-            "issues": [
-                {
-                    "id": issue["id"],
-                    "key": issue["key"],
-                    "summary": issue["fields"]["summary"],
-                    "description": issue["fields"]["description"],
-                    "type": issue["fields"]["issuetype"]["name"]
-                }
-                for issue in issues
-            ]
+            "issues": kept,
+            "streamed": count,
+            "note": f"All {count} issues were written to the output; the first {len(kept)} are listed here."
         }
     except Exception as e:
         return {"error": str(e)}
 
+def search_issues(query: str, project=None, limit=10) -> dict:
+    print(f"Searching issues for '{query}'")
+    try:
+        index = get_index()
+        if index is None:
+            return {"error": "The issue index is off; set JIRA_INDEX_PATH or JIRA_MIRROR_PATH"}
+        if project and reads_from_mirror(project):
+            get_mirror().ensure_fresh(project, search_for_mirror)
+        return {"issues": index.search(query, project, limit)}
+    except Exception as e:
+        return {"error": str(e)}
+
 def get_issue_comments(issue_id=None, issue_key=None) -> dict:
     key = issue_id or issue_key
-    try:
-        comments = jira.issue_get_comments(key)
+    def fetch():
+        # Jira answers {"comments": [...], "total": ...}
+        comments = call_with_retry("jira", jira.issue_get_comments, key).get("comments", [])
+        _index([{"key": key, "comments": [comment.get("body") for comment in comments]}])
         return {
             "comments": [
                 {
@@ -101,30 +270,168 @@ def get_issue_comments(issue_id=None, issue_key=None) -> dict:
                 }
                 for comment in comments
             ]
-        }
+        }, None
+
+    try:
+        return issue_cache.read("comments", key, fetch, lambda: _issue_version(key))
     except Exception as e:
         return {"error": str(e)}
 
+def _transitions_of(issue):
+    # Transitions of an issue read with expand=transitions
+    return [
+        {
+            "id": t["id"],
+            "name": t["name"],
+            "to": (t.get("to") or {}).get("name")
+        }
+        for t in issue.get("transitions", [])
+    ]
+
+def _list_transitions(key):
+    # Read with the issue's type in the same request: workflows differ per issue type
+    issue = call_with_retry("jira", jira.issue, key, fields="issuetype", expand="transitions")
+    transitions = _transitions_of(issue)
+    workflow_index.learn(key, issue["fields"]["issuetype"]["name"], transitions)
+    return transitions
+
+def _known_type(key):
+    # The issue type without a Jira call: learned earlier, or from the mirror
+    issue_type = workflow_index.type_of(key)
+    if issue_type is None and "-" in key and reads_from_mirror(project_of(key)):
+        mirrored = get_mirror().issue(key)
+        if mirrored is not None:
+            issue_type = mirrored["type"]
+            workflow_index.note_type(key, issue_type)
+    return issue_type
+
 def get_issue_transitions(issue_id=None, issue_key=None) -> dict:
     key = issue_id or issue_key
+    def fetch():
+        return {"transitions": _list_transitions(key)}, None
+
     try:
-        transitions = jira.get_issue_transitions(key)
-        return {
-            "transitions": [
-                {
-                    "id": t["id"],
-                    "name": t["name"]
-                }
-                for t in transitions
-            ]
-        }
+        return issue_cache.read("transitions", key, fetch, lambda: _issue_version(key))
     except Exception as e:
         return {"error": str(e)}
 
-def transition_issue(issue_id=None, issue_key=None, transition_id=None) -> dict:
+def _transition_to_status(key, status):
+    transition_id = workflow_index.resolve(key, status) if _known_type(key) else None
+    if transition_id is not None:
+        try:
+            call_with_retry("jira", jira.set_issue_status_by_transition_id, key, transition_id, idempotent=False)
+            return
+        except HTTPError:
+            # The learned transition is not available from this issue's current status
+            workflow_index.forget(key, status)
+
+    _list_transitions(key)
+    transition_id = workflow_index.resolve(key, status)
+    if transition_id is None:
+        raise ValueError(f"No transition to '{status}' is available for issue {key}")
+    call_with_retry("jira", jira.set_issue_status_by_transition_id, key, transition_id, idempotent=False)
+
+def transition_issue(issue_id=None, issue_key=None, transition_id=None, status=None) -> dict:
     key = issue_id or issue_key
     try:
-        jira.set_issue_transition(key, transition_id)
+        if transition_id:
+            call_with_retry("jira", jira.set_issue_status_by_transition_id, key, transition_id, idempotent=False)
+        elif status:
+            _transition_to_status(key, status)
+        else:
+            return {"error": "Either transition_id or status is required"}
+        _invalidate(key)
         return {"message": f"Issue {key} transitioned successfully"}
     except Exception as e:
         return {"error": str(e)}
+
+# --- Bulk operations ---
+
+def _bulk_issue_updates(chunk):
+    return [
+        {
+            "fields": {
+                "project": {"key": item["project"]},
+                "summary": item["summary"],
+                "description": item.get("description", ""),
+                "issuetype": {"name": item["issue_type"]}
+            }
+        }
+        for item in chunk
+    ]
+
+def _bulk_create_results(chunk, response):
+    # Map Jira's bulk create response back onto the input items, in order
+    failed = {
+        error["failedElementNumber"]: error.get("elementErrors", {})
+        for error in response.get("errors", [])
+    }
+    created = iter(response.get("issues", []))
+    results = []
+    for index in range(len(chunk)):
+        if index in failed:
+            errors = failed[index]
+            message = "; ".join(errors.get("errorMessages", []) + [f"{k}: {v}" for k, v in errors.get("errors", {}).items()])
+            results.append({"error": message or "Issue could not be created"})
+        else:
+            issue = next(created)
+            results.append({"key": issue.get("key"), "id": issue.get("id"), "message": "Issue created successfully"})
+    return results
+
+def _create_chunk(chunk):
+    try:
+        response = call_with_retry("jira", jira.create_issues, _bulk_issue_updates(chunk), idempotent=False)
+    except HTTPError as e:
+        # Jira answers 400 when every issue in the request failed
+        if e.response is None or e.response.status_code != 400:
+            raise
+        response = e.response.json()
+    for project in {item["project"] for item in chunk}:
+        _invalidate(None, project)
+    results = _bulk_create_results(chunk, response)
+    _created([dict(item, key=result["key"]) for item, result in zip(chunk, results) if "key" in result])
+    return results
+
+def _bulk_duplicates(issues, force):
+    # Per-item duplicate results (None: create it), as create_issue would answer for each
+    if force:
+        return [None] * len(issues)
+    return [
+        None if item.get("force") else _duplicates_of(item["project"], item["summary"], item.get("description"))
+        for item in issues
+    ]
+
+def _bulk_chunks(results, chunk_size):
+    # Indexes of the items still to create, in chunks
+    pending = [index for index, result in enumerate(results) if result is None]
+    return [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+
+def bulk_create_issues(issues: list, chunk_size=JIRA_BULK_CHUNK_SIZE, force: bool = False) -> dict:
+    print(f"Creating {len(issues)} issues in bulk")
+    results = _bulk_duplicates(issues, force)
+    for indexes in _bulk_chunks(results, chunk_size):
+        chunk = [issues[index] for index in indexes]
+        try:
+            created = _create_chunk(chunk)
+        except Exception as e:
+            created = [{"error": str(e)} for _ in chunk]
+        for index, result in zip(indexes, created):
+            results[index] = result
+    return {"results": [dict(result, index=index) for index, result in enumerate(results)]}
+
+def _run_bulk(func, items, max_workers):
+    def run(item):
+        try:
+            return func(**item)
+        except Exception as e:
+            return {"error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(run, items))
+    return {"results": [dict(result, index=index) for index, result in enumerate(results)]}
+
+def bulk_update_issues(updates: list, max_workers=JIRA_BULK_WORKERS) -> dict:
+    return _run_bulk(update_issue, updates, max_workers)
+
+def bulk_transition_issues(transitions: list, max_workers=JIRA_BULK_WORKERS) -> dict:
+    return _run_bulk(transition_issue, transitions, max_workers)
@@ -0,0 +1,275 @@
+import os
+import sys
+import math
+import time
+import sqlite3
+import argparse
+import threading
+from jira_workflows import project_of
+from issue_index import get_index
+from issue_records import IssueRecord
+
+# Local SQLite copy of chosen Jira projects, kept fresh by incremental syncs
+JIRA_MIRROR_PATH = os.getenv("JIRA_MIRROR_PATH")  # e.g. .jira_mirror.sqlite3; unset disables the mirror
+JIRA_MIRROR_PROJECTS = {
+    project.strip().upper() for project in os.getenv("JIRA_MIRROR_PROJECTS", "").split(",") if project.strip()
+}
+# Read tools serve mirrored projects from SQLite when JIRA_READ_MODE=mirror
+JIRA_READ_MODE = os.getenv("JIRA_READ_MODE", "live").lower()
+# Oldest a mirrored project may be before a read triggers an incremental sync
+JIRA_MIRROR_MAX_STALENESS = float(os.getenv("JIRA_MIRROR_MAX_STALENESS", "300"))
+# Incremental syncs re-read this many extra seconds, so edits racing the previous sync are not missed
+JIRA_MIRROR_OVERLAP = float(os.getenv("JIRA_MIRROR_OVERLAP", "60"))
+
+ISSUE_COLUMNS = ("id", "key", "summary", "description", "type")
+
+
+class JiraMirror:
+    """
+    SQLite mirror of Jira projects.
+
+    The first sync of a project loads every issue. Later syncs only fetch
+    issues updated since the previous sync started, using relative JQL
+    (updated >= -Nm) so the watermark does not depend on Jira's timezone.
+    Full syncs also drop issues that were deleted in Jira.
+    """
+
+    def __init__(self, path=JIRA_MIRROR_PATH, projects=None, max_staleness=JIRA_MIRROR_MAX_STALENESS):
+        self.projects = JIRA_MIRROR_PROJECTS if projects is None else {project.upper() for project in projects}
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._sync_locks = {}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS issues ("
+            "key TEXT PRIMARY KEY, id TEXT, project TEXT NOT NULL, number INTEGER, summary TEXT, "
+            "description TEXT, type TEXT, updated TEXT, seen_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS issues_project ON issues (project, number);"
+            "CREATE INDEX IF NOT EXISTS issues_id ON issues (id);"
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            "project TEXT PRIMARY KEY, started_at REAL NOT NULL, synced_at REAL NOT NULL);"
+        )
+        self._db.commit()
+
+    def serves(self, project):
+        # Chosen in JIRA_MIRROR_PROJECTS, or synced explicitly from the command line
+        return project.upper() in self.projects or self._state(project.upper()) is not None
+
+    def _state(self, project):
+        with self._lock:
+            return self._db.execute(
+                "SELECT started_at, synced_at FROM sync_state WHERE project = ?", (project,)
+            ).fetchone()
+
+    def is_fresh(self, project, max_staleness=None):
+        state = self._state(project.upper())
+        limit = self.max_staleness if max_staleness is None else max_staleness
+        return state is not None and time.time() - state[1] <= limit
+
+    def _upsert(self, project, issues, seen_at):
+        rows = [
+            (issue["key"], issue["id"], project, int(issue["key"].rsplit("-", 1)[-1]), issue["summary"],
+             issue["description"], issue["type"], issue.get("updated"), seen_at)
+            for issue in issues
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO issues "
+                "(key, id, project, number, summary, description, type, updated, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._db.commit()
+        # Keep the full-text index in step with the mirror
+        if get_index() is not None:
+            get_index().add(issues)
+
+    def sync(self, project, search, full=False, batch_size=500):
+        """
+        Brings a project's mirror up to date.
+        :param project: The project key
+        :param search: Callable taking a JQL string and yielding issue dicts (with "updated")
+        :param full: Reload every issue and drop ones deleted in Jira
+        :param batch_size: Issues written per SQLite transaction
+        :return: {"project", "mode", "fetched", "removed", "seconds"}
+        """
+        project = project.upper()
+        with self._lock:
+            sync_lock = self._sync_locks.setdefault(project, threading.Lock())
+
+        with sync_lock:
+            state = self._state(project)
+            full = full or state is None
+            started_at = time.time()
+            if full:
+                jql = f"project = {project} ORDER BY key ASC"
+            else:
+                minutes = math.ceil((started_at - state[0] + JIRA_MIRROR_OVERLAP) / 60)
+                # Paged by key: an issue edited mid-sync must not shift its neighbours past the offsets
+                jql = f"project = {project} AND updated >= -{minutes}m ORDER BY key ASC"
+
+            fetched = 0
+            batch = []
+            for issue in search(jql):
+                batch.append(issue)
+                if len(batch) >= batch_size:
+                    self._upsert(project, batch, started_at)
+                    fetched += len(batch)
+                    batch = []
+            self._upsert(project, batch, started_at)
+            fetched += len(batch)
+
+            removed = []
+            with self._lock:
+                if full:
+                    removed = [row[0] for row in self._db.execute(
+                        "SELECT key FROM issues WHERE project = ? AND seen_at < ?", (project, started_at)
+                    )]
+                    self._db.execute("DELETE FROM issues WHERE project = ? AND seen_at < ?", (project, started_at))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sync_state (project, started_at, synced_at) VALUES (?, ?, ?)",
+                    (project, started_at, time.time())
+                )
+                self._db.commit()
+            if removed and get_index() is not None:
+                get_index().remove(removed)
+
+        return {
+            "project": project,
+            "mode": "full" if full else "incremental",
+            "fetched": fetched,
+            "removed": len(removed),
+            "seconds": round(time.time() - started_at, 3)
+        }
+
+    def ensure_fresh(self, project, search, max_staleness=None):
+        # Syncs a stale project; if Jira is unreachable, serves what was mirrored last
+        if self.is_fresh(project, max_staleness):
+            return
+        try:
+            self.sync(project, search)
+        except Exception as e:
+            if self._state(project.upper()) is None:
+                raise
+            print(f"[WARN] Mirror sync of {project} failed ({e}); serving the last mirrored copy")
+
+    def issues(self, project, limit=None):
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(ISSUE_COLUMNS)} FROM issues WHERE project = ? ORDER BY number LIMIT ?",
+                (project.upper(), -1 if limit is None else limit)
+            ).fetchall()
+        return [IssueRecord(*row) for row in rows]
+
+    def iter_issues(self, project, batch_size=1000):
+        # Keyset pages, so the lock is never held while the caller consumes rows
+        number = -1
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT number, {', '.join(ISSUE_COLUMNS)} FROM issues "
+                    "WHERE project = ? AND number > ? ORDER BY number LIMIT ?",
+                    (project.upper(), number, batch_size)
+                ).fetchall()
+            for row in rows:
+                yield IssueRecord(*row[1:])
+            if len(rows) < batch_size:
+                return
+            number = rows[-1][0]
+
+    def issue(self, key_or_id):
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(ISSUE_COLUMNS)} FROM issues WHERE key = ? OR id = ?",
+                (key_or_id.upper(), key_or_id)
+            ).fetchone()
+        return dict(zip(ISSUE_COLUMNS, row)) if row else None
+
+    def changed(self, key_or_id=None, project=None):
+        # After one of our own writes: the next read of the project syncs first
+        if project is None:
+            mirrored = self.issue(key_or_id)
+            project = project_of(mirrored["key"] if mirrored else key_or_id)
+        with self._lock:
+            self._db.execute("UPDATE sync_state SET synced_at = 0 WHERE project = ?", (project.upper(),))
+            self._db.commit()
+
+    def put(self, issues):
+        # Pushed changes (webhooks): applied as they are, without marking the project stale
+        by_project = {}
+        for issue in issues:
+            by_project.setdefault(project_of(issue["key"]), []).append(issue)
+        for project, batch in by_project.items():
+            if self.serves(project):
+                self._upsert(project, batch, time.time())
+
+    def remove(self, key_or_id, mark_stale=True):
+        if mark_stale:
+            self.changed(key_or_id)
+        mirrored = self.issue(key_or_id)
+        if get_index() is not None:
+            get_index().remove([mirrored["key"] if mirrored else key_or_id])
+        with self._lock:
+            self._db.execute("DELETE FROM issues WHERE key = ? OR id = ?", (key_or_id.upper(), key_or_id))
+            self._db.commit()
+
+    def status(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT s.project, s.synced_at, COUNT(i.key) FROM sync_state s "
+                "LEFT JOIN issues i ON i.project = s.project GROUP BY s.project"
+            ).fetchall()
+        now = time.time()
+        return {
+            project: {"issues": count, "age_seconds": round(now - synced_at, 1) if synced_at else None}
+            for project, synced_at, count in rows
+        }
+
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror():
+    global _mirror
+    if not JIRA_MIRROR_PATH:
+        return None
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = JiraMirror()
+    return _mirror
+
+
+def reads_from_mirror(project):
+    mirror = get_mirror()
+    return mirror is not None and JIRA_READ_MODE == "mirror" and mirror.serves(project)
+
+
+def main_mirror():
+    parser = argparse.ArgumentParser(description="Sync Jira projects into the local SQLite mirror.")
+    parser.add_argument("command", choices=["sync", "status"])
+    parser.add_argument("projects", nargs="*", help="Project keys (defaults to JIRA_MIRROR_PROJECTS)")
+    parser.add_argument("--full", action="store_true", help="Reload everything and drop issues deleted in Jira")
+    options = parser.parse_args()
+
+    mirror = get_mirror()
+    if mirror is None:
+        print("[ERROR] Set JIRA_MIRROR_PATH to enable the mirror.")
+        sys.exit(1)
+
+    if options.command == "status":
+        for project, state in mirror.status().items():
+            print(f"[INFO] {project}: {state['issues']} issues, synced {state['age_seconds']}s ago")
+        return
+
+    import jira_functions
+    for project in options.projects or sorted(mirror.projects):
+        result = mirror.sync(project, jira_functions.search_for_mirror, full=options.full)
+        print(
+            f"[INFO] {result['project']}: {result['mode']} sync fetched {result['fetched']} issues, "
+            f"removed {result['removed']} in {result['seconds']}s"
+        )
+
+
+if __name__ == "__main__":
+    main_mirror()
@@ -0,0 +1,65 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Page size and number of pages fetched ahead while the caller consumes the current one
+JIRA_PAGE_SIZE = int(os.getenv("JIRA_PAGE_SIZE", "100"))
+JIRA_PREFETCH_PAGES = int(os.getenv("JIRA_PREFETCH_PAGES", "2"))
+
+
+def paginate(fetch_page, page_size=JIRA_PAGE_SIZE, prefetch=JIRA_PREFETCH_PAGES):
+    """
+    Yields items from an offset-paginated Jira search, one page in memory at a time.
+    :param fetch_page: Callable taking (start, page_size) and returning (items, total)
+    :param page_size: Number of items requested per page
+    :param prefetch: Number of upcoming pages fetched in parallel
+    :return: A generator over all items
+    """
+    items, total = fetch_page(0, page_size)
+    yield from items
+    # Jira may return fewer than requested (Cloud caps maxResults), so later
+    # offsets step by what the first page actually held
+    stride = len(items)
+    if not stride:
+        return
+
+    # Without a reported total, walk the pages one by one until a short page
+    if total is None:
+        start = stride
+        while len(items) == stride:
+            items, _ = fetch_page(start, page_size)
+            yield from items
+            start += len(items)
+        return
+
+    starts = iter(range(stride, total, stride))
+    if prefetch <= 0:
+        for start in starts:
+            yield from _fill(fetch_page, start, fetch_page(start, page_size)[0], stride, total, page_size)
+        return
+
+    with ThreadPoolExecutor(max_workers=prefetch) as pool:
+        window = deque()
+        for start in starts:
+            window.append((start, pool.submit(fetch_page, start, page_size)))
+            if len(window) >= prefetch:
+                break
+        while window:
+            start, future = window.popleft()
+            items, _ = future.result()
+            next_start = next(starts, None)
+            if next_start is not None:
+                window.append((next_start, pool.submit(fetch_page, next_start, page_size)))
+            yield from _fill(fetch_page, start, items, stride, total, page_size)
+
+
+def _fill(fetch_page, start, items, stride, total, page_size):
+    # A page shorter than the stride leaves a gap before the next prefetched
+    # offset; fetch the rest of its range before moving on
+    yield from items
+    end = min(start + stride, total)
+    start += len(items)
+    while items and start < end:
+        items, _ = fetch_page(start, min(page_size, end - start))
+        yield from items
+        start += len(items)
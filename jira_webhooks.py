@@ -0,0 +1,323 @@
+import os
+import sys
+import hmac
+import json
+import time
+import hashlib
+import argparse
+import ipaddress
+import importlib
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from jira_mirror import get_mirror
+from jira_workflows import project_of
+from issue_index import get_index
+
+# Standalone listener address (agent_server.py also accepts webhooks at the same path)
+JIRA_WEBHOOK_HOST = os.getenv("JIRA_WEBHOOK_HOST", "127.0.0.1")
+JIRA_WEBHOOK_PORT = int(os.getenv("JIRA_WEBHOOK_PORT", "8766"))
+JIRA_WEBHOOK_PATH = "/webhooks/jira"
+# Shared secret: checked against the X-Hub-Signature HMAC (Jira Cloud) or a ?secret= query parameter (Server/DC)
+JIRA_WEBHOOK_SECRET = os.getenv("JIRA_WEBHOOK_SECRET")
+# Events are applied once no new one has arrived for this many seconds...
+JIRA_WEBHOOK_DEBOUNCE = float(os.getenv("JIRA_WEBHOOK_DEBOUNCE", "0.5"))
+# ...or at the latest this long after the first pending event
+JIRA_WEBHOOK_MAX_DELAY = float(os.getenv("JIRA_WEBHOOK_MAX_DELAY", "5"))
+
+# Change applied per webhook event; events not listed here are acknowledged and ignored
+EVENT_ACTIONS = {
+    "jira:issue_created": "upsert",
+    "jira:issue_updated": "upsert",
+    "jira:issue_deleted": "delete",
+    # Comment events carry a partial issue, so they only drop cached reads
+    "comment_created": "invalidate",
+    "comment_updated": "invalidate",
+    "comment_deleted": "invalidate",
+}
+# When several events for one issue arrive within a burst, the strongest wins
+ACTION_RANK = {"invalidate": 0, "upsert": 1, "delete": 2}
+
+
+def verify(body, headers, query, secret=JIRA_WEBHOOK_SECRET):
+    if not secret:
+        return True
+    signature = headers.get("X-Hub-Signature") or ""
+    if signature.startswith("sha256="):
+        expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(signature[len("sha256="):], expected)
+    return hmac.compare_digest(query.get("secret", [""])[0], secret)
+
+
+def _loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def webhooks_allowed(host):
+    """
+    Startup check for a listener that accepts webhooks.
+    :param host: The address listened on (None for a Unix socket)
+    :return: False when deliveries must be refused: no JIRA_WEBHOOK_SECRET and reachable from other machines
+    """
+    if JIRA_WEBHOOK_SECRET:
+        return True
+    if host is None or _loopback(host):
+        print("[WARN] JIRA_WEBHOOK_SECRET is not set; webhook deliveries are not authenticated (local listener only)")
+        return True
+    print(f"[ERROR] Set JIRA_WEBHOOK_SECRET to accept Jira webhooks on {host}; anyone could push changes into the caches")
+    return False
+
+
+def changes_from(event):
+    """
+    Turns one webhook payload into per-issue changes.
+    :param event: The decoded webhook body
+    :return: [(issue key, {"action", "issue", "id"})]; empty for events that do not touch cached reads
+    """
+    action = EVENT_ACTIONS.get(event.get("webhookEvent"))
+    issue = event.get("issue") or {}
+    if action is None or not issue.get("key"):
+        return []
+    changes = [(issue["key"].upper(), {"action": action, "issue": issue if action == "upsert" else None, "id": issue.get("id")})]
+    # A move to another project changes the key; the old key is gone
+    for item in (event.get("changelog") or {}).get("items", []):
+        if item.get("field") == "Key" and item.get("fromString"):
+            changes.append((item["fromString"].upper(), {"action": "delete", "issue": None, "id": None}))
+    return changes
+
+
+class WebhookApplier:
+    """
+    Applies pushed Jira changes to the issue cache, mirror and full-text index.
+
+    Events are queued per issue and applied together once a burst settles,
+    so a bulk edit that fires fifty updates for one issue costs one write.
+    Upserts store the issue from the payload, so no Jira round trip is made.
+    """
+
+    def __init__(self, debounce=JIRA_WEBHOOK_DEBOUNCE, max_delay=JIRA_WEBHOOK_MAX_DELAY):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._pending = {}
+        self._first_at = None
+        self._last_at = None
+        self._stats = {"events": 0, "ignored": 0, "coalesced": 0, "applied": 0, "errors": 0}
+        self._lock = threading.Condition()
+        self._thread = None
+
+    def submit(self, event):
+        changes = changes_from(event)
+        with self._lock:
+            self._stats["events"] += 1
+            if not changes:
+                self._stats["ignored"] += 1
+                return
+            now = time.time()
+            self._first_at = self._first_at or now
+            self._last_at = now
+            for key, change in changes:
+                previous = self._pending.get(key)
+                if previous is not None:
+                    self._stats["coalesced"] += 1
+                    if ACTION_RANK[previous["action"]] > ACTION_RANK[change["action"]]:
+                        continue
+                self._pending[key] = change
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="jira-webhooks", daemon=True)
+                self._thread.start()
+            self._lock.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._lock.wait()
+                due = min(self._last_at + self.debounce, self._first_at + self.max_delay)
+                if time.time() < due:
+                    self._lock.wait(due - time.time())
+                    continue
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._first_at = self._last_at = None
+        if not pending:
+            return
+        try:
+            _apply(pending)
+            applied, errors = len(pending), 0
+        except Exception as e:
+            # The next read revalidates as usual; a lost push only costs freshness
+            print(f"[WARN] Applying {len(pending)} Jira webhook changes failed: {e}")
+            applied, errors = 0, len(pending)
+        with self._lock:
+            self._stats["applied"] += applied
+            self._stats["errors"] += errors
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending))
+
+
+def _apply(pending):
+    # Imported lazily: the tools' issue cache lives in jira_functions
+    jira_functions = importlib.import_module("jira_functions")
+    mirror, index = get_mirror(), get_index()
+    upserts = []
+    for key, change in pending.items():
+        jira_functions.issue_cache.invalidate(key)
+        if change["id"]:
+            jira_functions.issue_cache.invalidate(change["id"])
+        if change["action"] == "delete":
+            if mirror is not None:
+                mirror.remove(key, mark_stale=False)
+            elif index is not None:
+                index.remove([key])
+        elif change["action"] == "upsert":
+            issue = change["issue"]
+            upserts.append(dict(
+                jira_functions._to_dict(issue),
+                updated=issue["fields"].get("updated"),
+                comments=jira_functions._comment_bodies(issue)
+            ))
+    if upserts and mirror is not None:
+        # The mirror indexes the projects it serves
+        mirror.put(upserts)
+    if upserts and index is not None:
+        index.add([issue for issue in upserts if mirror is None or not mirror.serves(project_of(issue["key"]))])
+
+
+_applier = None
+_applier_lock = threading.Lock()
+
+
+def get_applier():
+    global _applier
+    with _applier_lock:
+        if _applier is None:
+            _applier = WebhookApplier()
+    return _applier
+
+
+def handle_webhook(body, headers, query):
+    """
+    Checks and queues one webhook delivery.
+    :param body: The raw request body
+    :param headers: The request headers
+    :param query: The parsed query string
+    :return: (HTTP status, JSON payload)
+    """
+    if not verify(body, headers, query):
+        return 401, {"error": "Invalid webhook signature"}
+    try:
+        event = json.loads(body or b"{}")
+    except json.JSONDecodeError as e:
+        return 400, {"error": f"Invalid webhook body: {e}"}
+    get_applier().submit(event)
+    # Answer straight away; Jira retries slow deliveries
+    return 202, {"status": "queued"}
+
+
+class WebhookRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "webhooks": get_applier().stats()})
+        else:
+            self._send_json(404, {"error": f"Unknown path '{self.path}'"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != JIRA_WEBHOOK_PATH:
+            self._send_json(404, {"error": f"Unknown path '{url.path}'"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        self._send_json(*handle_webhook(self.rfile.read(length), self.headers, parse_qs(url.query)))
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def replay(paths, url=None):
+    """
+    Replays recorded webhook payloads, one JSON object per line.
+    :param paths: JSONL files
+    :param url: A listener to POST them to; without one they are applied in this process
+    :return: The number of payloads sent
+    """
+    session = None
+    if url:
+        from http_pool import create_session
+        session = create_session()
+    sent = 0
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if session is None:
+                    get_applier().submit(json.loads(line))
+                else:
+                    body = line.strip().encode("utf-8")
+                    headers = {"Content-Type": "application/json"}
+                    if JIRA_WEBHOOK_SECRET:
+                        digest = hmac.new(JIRA_WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+                        headers["X-Hub-Signature"] = f"sha256={digest}"
+                    session.post(url, data=body, headers=headers).raise_for_status()
+                sent += 1
+    if session is None:
+        get_applier().flush()
+    return sent
+
+
+def main_webhooks():
+    parser = argparse.ArgumentParser(description="Receive Jira webhooks and apply them to the local caches.")
+    parser.add_argument("command", choices=["serve", "replay"])
+    parser.add_argument("paths", nargs="*", help="JSONL files of recorded payloads (replay)")
+    parser.add_argument("--host", default=JIRA_WEBHOOK_HOST)
+    parser.add_argument("--port", type=int, default=JIRA_WEBHOOK_PORT)
+    parser.add_argument("--url", help="Replay against this listener instead of applying in process")
+    options = parser.parse_args()
+
+    if options.command == "replay":
+        if not options.paths:
+            parser.error("replay needs at least one JSONL file")
+        sent = replay(options.paths, options.url)
+        print(f"[INFO] Replayed {sent} webhook payloads")
+        if not options.url:
+            print(f"[INFO] {get_applier().stats()}")
+        return
+
+    if get_mirror() is None and get_index() is None and not os.getenv("JIRA_CACHE_PATH"):
+        # Nothing here is shared with other processes
+        print("[WARN] No JIRA_CACHE_PATH, JIRA_MIRROR_PATH or JIRA_INDEX_PATH set; run agent_server.py to receive webhooks in process")
+    if not webhooks_allowed(options.host):
+        sys.exit(1)
+    server = ThreadingHTTPServer((options.host, options.port), WebhookRequestHandler)
+    print(f"[INFO] Jira webhook listener on http://{options.host}:{options.port}{JIRA_WEBHOOK_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        get_applier().flush()
+
+
+if __name__ == "__main__":
+    main_webhooks()
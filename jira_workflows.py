@@ -0,0 +1,89 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# How long a learned workflow is trusted before it is rebuilt
+JIRA_WORKFLOW_INDEX_TTL = float(os.getenv("JIRA_WORKFLOW_INDEX_TTL", "86400"))
+# Issue types remembered per issue key, so a transition can pick its workflow without a lookup
+JIRA_WORKFLOW_TYPES_SIZE = int(os.getenv("JIRA_WORKFLOW_TYPES_SIZE", "10000"))
+
+
+def project_of(issue_key):
+    return issue_key.rsplit("-", 1)[0].upper()
+
+
+class WorkflowIndex:
+    """
+    Maps target status names, and separately transition names, to transition
+    IDs per project and issue type.
+
+    Jira assigns workflows by project and issue type, so a Bug and a Story in
+    the same project can reach "Done" through different transitions. The
+    index is learned from transition listings (which also give the issue's
+    type) and refreshed lazily, so moving an issue by status name normally
+    needs no lookup round trip once its type is known.
+    """
+
+    def __init__(self, ttl=JIRA_WORKFLOW_INDEX_TTL, max_types=JIRA_WORKFLOW_TYPES_SIZE):
+        self.ttl = ttl
+        self.max_types = max_types
+        self._workflows = {}
+        self._types = OrderedDict()
+        self._lock = threading.Lock()
+
+    def note_type(self, issue_key, issue_type):
+        # Remember an issue's type whenever an issue read or write reveals it
+        if not issue_key or not issue_type:
+            return
+        with self._lock:
+            self._types[issue_key.upper()] = issue_type
+            self._types.move_to_end(issue_key.upper())
+            while len(self._types) > self.max_types:
+                self._types.popitem(last=False)
+
+    def type_of(self, issue_key):
+        with self._lock:
+            return self._types.get(issue_key.upper())
+
+    def learn(self, issue_key, issue_type, transitions):
+        """
+        Records the transitions available on an issue.
+        :param issue_key: The issue the transitions were listed for
+        :param issue_type: The issue's type name
+        :param transitions: Dicts with "id", "name" and optionally "to" (target status name)
+        """
+        self.note_type(issue_key, issue_type)
+        workflow = (project_of(issue_key), issue_type)
+        with self._lock:
+            targets, names, built_at = self._workflows.get(workflow, ({}, {}, time.time()))
+            if time.time() - built_at >= self.ttl:
+                targets, names, built_at = {}, {}, time.time()
+            for transition in transitions:
+                names[transition["name"].lower()] = str(transition["id"])
+                if transition.get("to"):
+                    targets[transition["to"].lower()] = str(transition["id"])
+            self._workflows[workflow] = (targets, names, built_at)
+
+    def resolve(self, issue_key, status):
+        """
+        Looks up the transition ID that moves an issue to a status.
+        :param issue_key: The issue key
+        :param status: The target status or, failing that, transition name
+        :return: The transition ID, or None if the issue type is unknown or the workflow unknown or stale
+        """
+        issue_type = self.type_of(issue_key)
+        if issue_type is None:
+            return None
+        with self._lock:
+            targets, names, built_at = self._workflows.get((project_of(issue_key), issue_type), ({}, {}, 0))
+        if time.time() - built_at >= self.ttl:
+            return None
+        return targets.get(status.lower()) or names.get(status.lower())
+
+    def forget(self, issue_key, status):
+        issue_type = self.type_of(issue_key)
+        with self._lock:
+            targets, names, _ = self._workflows.get((project_of(issue_key), issue_type), ({}, {}, 0))
+            targets.pop(status.lower(), None)
+            names.pop(status.lower(), None)
@@ -2,62 +2,185 @@ import os
 import sys
 import json
 import time
+import argparse
+import weakref
+import importlib
+import contextlib
+import threading
+from types import SimpleNamespace
 from dotenv import load_dotenv
-from openai import OpenAI, RateLimitError, OpenAIError
-from datadog import initialize as dd_initialize
-from datadog_functions import send_custom_metric, log_event, send_service_check
-from jira_functions import create_issue, update_issue, delete_issue, get_issue, get_issues, transition_issue
 
+# Before any first-party import: those modules read their settings from the environment at import time
 load_dotenv()
 
-# Initialize Datadog
-dd_initialize(
-    api_key=os.getenv("DATADOG_API_KEY"),
-    app_key=os.getenv("DATADOG_APP_KEY")
-)
+from datadog_buffer import record_metric
+from tool_dispatcher import dispatch_tool_calls, dispatch_tool_calls_async, StreamingDispatcher, backend_for
+from retry import call_with_retry, async_call_with_retry, CircuitOpenError
+from response_cache import get_response_cache, cache_key
+from intent_router import router
+from tool_selector import ToolSelector
+from issue_records import write_result, AGENT_OUTPUT_FORMAT, OUTPUT_FORMATS
+from result_shaper import get_shaper, TOOL_RESULT_TOKEN_BUDGET
+import agent_client
+import tracing
+
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1")
+OPENAI_STREAM = os.getenv("OPENAI_STREAM", "false").lower() in ("1", "true", "yes")
+
+# Agent loop budgets
+AGENT_MAX_TURNS = int(os.getenv("AGENT_MAX_TURNS", "8"))
+AGENT_MAX_TOKENS = int(os.getenv("AGENT_MAX_TOKENS", "50000"))
+
+# Tool name -> (module, function). Backend modules, and the clients they
+# create, are only imported the first time one of their tools is called.
+FUNCTIONS = {
+    # Datadog
+    "send_custom_metric": ("datadog_functions", "send_custom_metric"),
+    "log_event": ("datadog_functions", "log_event"),
+    "send_service_check": ("datadog_functions", "send_service_check"),
+    # Jira
+    "create_issue": ("jira_functions", "create_issue"),
+    "update_issue": ("jira_functions", "update_issue"),
+    "delete_issue": ("jira_functions", "delete_issue"),
+    "get_issue": ("jira_functions", "get_issue"),
+    "get_issues": ("jira_functions", "get_issues"),
+    # Not offered to the model: get_issues as run for --output ndjson/csv
+    "stream_issues": ("jira_functions", "stream_issues"),
+    "search_issues": ("jira_functions", "search_issues"),
+    "get_issue_comments": ("jira_functions", "get_issue_comments"),
+    "get_issue_transitions": ("jira_functions", "get_issue_transitions"),
+    "transition_issue": ("jira_functions", "transition_issue"),
+    "bulk_create_issues": ("jira_functions", "bulk_create_issues"),
+    "bulk_update_issues": ("jira_functions", "bulk_update_issues"),
+    "bulk_transition_issues": ("jira_functions", "bulk_transition_issues"),
+    # Local: pages through a tool result that was too big to send whole
+    "get_result_page": ("result_shaper", "get_result_page")
+}
+
+# Coroutine versions of the same tools, used by run_agent_async
+ASYNC_FUNCTIONS = {
+    name: (f"async_{module_name}", function_name)
+    for name, (module_name, function_name) in FUNCTIONS.items()
+}
+ASYNC_FUNCTIONS["get_result_page"] = ("result_shaper", "get_result_page_async")
+# Streaming to the output is a run_agent (CLI) feature
+del ASYNC_FUNCTIONS["stream_issues"]
+
+_client = None
+# One AsyncOpenAI client per event loop, like http_pool's httpx clients
+_async_clients = weakref.WeakKeyDictionary()
+_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            with tracing.span("client.init", backend="openai"):
+                from openai import OpenAI
+                _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+
+def get_async_openai_client():
+    import asyncio
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            with tracing.span("client.init", backend="openai"):
+                from openai import AsyncOpenAI
+                from http_pool import get_async_client
+                client = _async_clients[loop] = AsyncOpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"), http_client=get_async_client()
+                )
+    return client
+
+
+async def close_async_clients():
+    """
+    Closes the OpenAI and backend clients of the running event loop.
+    Call it before the loop shuts down; the next use on another loop creates fresh ones.
+    """
+    import asyncio
+    from http_pool import close_async_client
+    with _client_lock:
+        _async_clients.pop(asyncio.get_running_loop(), None)
+    await close_async_client()
+
+
+def get_function(name, functions=FUNCTIONS):
+    if name not in functions:
+        return None
+    module_name, function_name = functions[name]
+    if module_name not in sys.modules:
+        # First use of a backend: importing it creates its client
+        with tracing.span("client.init", module=module_name):
+            importlib.import_module(module_name)
+    # Not sys.modules[...]: while another thread is still importing the module, import_module waits for it
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def warm_backends():
+    # Long-running entry points pay every import and client setup up front
+    get_openai_client()
+    for module_name in {module_name for module_name, _ in FUNCTIONS.values()}:
+        importlib.import_module(module_name)
 
-# Initialize OpenAI
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 # Function dispatcher
 def call_function(name, args):
     try:
-        functions = {
-            # Datadog
-            "send_custom_metric": send_custom_metric,
-            "log_event": log_event,
-            "send_service_check": send_service_check,
-            # Jira
-            "create_issue": create_issue,
-            "update_issue": update_issue,
-            "delete_issue": delete_issue,
-            "get_issue": get_issue,
-            "get_issues": get_issues,
-            "transition_issue": transition_issue
-        }
-        func = functions.get(name)
+        func = get_function(name)
         if func is None:
             return {"error": f"Unknown function '{name}'"}
-        start = time.perf_counter()
-        result = func(**args)
-        duration = time.perf_counter() - start
-        send_custom_metric("jira.api.call.latency", duration, ["env:prod", name], "gauge")
+        backend = backend_for(name)
+        with tracing.span("backend.call", tool=name, backend=backend):
+            start = time.perf_counter()
+            result = func(**args)
+            duration = time.perf_counter() - start
+        if backend != "local":
+            record_metric(f"{backend}.api.call.latency", duration, ["env:prod", name], "gauge")
         return result
     except Exception as e:
-        log_event(
-            title=f"Function '{name}' execution failed",
-            text=str(e),
-            alert_type="error",
-            tags=["error", name]
-        )
+        try:
+            get_function("log_event")(
+                title=f"Function '{name}' execution failed",
+                text=str(e),
+                alert_type="error",
+                tags=["error", name]
+            )
+        except Exception as log_error:
+            # Reporting is best effort; the tool's own error is what the model needs
+            print(f"[WARN] Could not log the failure of '{name}' to Datadog: {log_error}")
         return {"error": str(e)}
 
-# Validate input
-if len(sys.argv) < 2:
-    print("Usage: python main.py \"<your prompt>\"")
-    sys.exit(1)
 
-user_prompt = sys.argv[1]
+async def call_function_async(name, args):
+    try:
+        func = get_function(name, ASYNC_FUNCTIONS)
+        if func is None:
+            return {"error": f"Unknown function '{name}'"}
+        backend = backend_for(name)
+        with tracing.span("backend.call", tool=name, backend=backend):
+            start = time.perf_counter()
+            result = await func(**args)
+            duration = time.perf_counter() - start
+        if backend != "local":
+            record_metric(f"{backend}.api.call.latency", duration, ["env:prod", name], "gauge")
+        return result
+    except Exception as e:
+        try:
+            await get_function("log_event", ASYNC_FUNCTIONS)(
+                title=f"Function '{name}' execution failed",
+                text=str(e),
+                alert_type="error",
+                tags=["error", name]
+            )
+        except Exception as log_error:
+            # Reporting is best effort; the tool's own error is what the model needs
+            print(f"[WARN] Could not log the failure of '{name}' to Datadog: {log_error}")
+        return {"error": str(e)}
 
 # Tool definitions
 TOOLS = [
@@ -65,14 +188,18 @@ TOOLS = [
         "type": "function",
         "function": {
             "name": "create_issue",
-            "description": "Create a new issue in a Jira project.",
+            "description": (
+                "Create a new issue in a Jira project. "
+                "If likely duplicates already exist, they are returned instead and nothing is created."
+            ),
             "parameters": {
                 "type": "object",
                 "properties": {
                     "project": {"type": "string"},
                     "summary": {"type": "string"},
                     "description": {"type": "string"},
-                    "issue_type": {"type": "string"}
+                    "issue_type": {"type": "string"},
+                    "force": {"type": "boolean", "description": "Create even if likely duplicates exist."}
                 },
                 "required": ["project", "summary", "description", "issue_type"]
             }
@@ -137,6 +264,39 @@ TOOLS = [
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "search_issues",
+            "description": (
+                "Full-text search over issue summaries, descriptions and comments. "
+                "Use it to find existing tickets instead of listing a whole project."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string"},
+                    "project": {"type": "string"},
+                    "limit": {"type": "integer"}
+                },
+                "required": ["query"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_result_page",
+            "description": "Fetch the next page of a large tool result, using the cursor it returned.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "cursor": {"type": "string"}
+                },
+                "required": ["cursor"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -169,68 +329,637 @@ TOOLS = [
         "type": "function",
         "function": {
             "name": "transition_issue",
-            "description": "Transition a Jira issue to a different state.",
+            "description": (
+                "Transition a Jira issue to a different state. "
+                "Pass the target status name (e.g. \"Done\"); transition_id is only needed if already known."
+            ),
             "parameters": {
                 "type": "object",
                 "properties": {
                     "issue_id": {"type": "string"},
+                    "status": {"type": "string"},
                     "transition_id": {"type": "string"}
                 },
-                "required": ["issue_id", "transition_id"]
+                "required": ["issue_id"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "bulk_create_issues",
+            "description": (
+                "Create many Jira issues at once. Prefer this over repeated create_issue calls. "
+                "Issues with likely duplicates are returned with those duplicates and not created."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "issues": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "project": {"type": "string"},
+                                "summary": {"type": "string"},
+                                "description": {"type": "string"},
+                                "issue_type": {"type": "string"}
+                            },
+                            "required": ["project", "summary", "description", "issue_type"]
+                        }
+                    },
+                    "force": {"type": "boolean", "description": "Create them even if likely duplicates exist"}
+                },
+                "required": ["issues"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "bulk_update_issues",
+            "description": "Update many existing Jira issues at once.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "updates": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "issue_id": {"type": "string"},
+                                "summary": {"type": "string"},
+                                "description": {"type": "string"},
+                                "issue_type": {"type": "string"}
+                            },
+                            "required": ["issue_id"]
+                        }
+                    }
+                },
+                "required": ["updates"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "bulk_transition_issues",
+            "description": "Transition many Jira issues at once, each to a target status name.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "transitions": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "issue_id": {"type": "string"},
+                                "status": {"type": "string"},
+                                "transition_id": {"type": "string"}
+                            },
+                            "required": ["issue_id"]
+                        }
+                    }
+                },
+                "required": ["transitions"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "send_custom_metric",
+            "description": "Send a custom metric to Datadog.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "metric_name": {"type": "string"},
+                    "value": {"type": "number"},
+                    "tags": {"type": "array", "items": {"type": "string"}},
+                    "metric_type": {"type": "string", "enum": ["gauge", "count", "rate", "distribution"]}
+                },
+                "required": ["metric_name", "value", "tags", "metric_type"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "log_event",
+            "description": "Log an event to Datadog.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "text": {"type": "string"},
+                    "alert_type": {"type": "string", "enum": ["info", "warning", "error", "success"]},
+                    "tags": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["title", "text", "alert_type", "tags"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "send_service_check",
+            "description": "Report a Datadog service check status (ok, warning, critical or unknown).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "check_name": {"type": "string"},
+                    "status": {"type": "string", "enum": ["ok", "warning", "critical", "unknown"]},
+                    "tags": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["check_name", "status", "tags"]
             }
         }
     }
 ]
 
+# Only the schemas relevant to a prompt are sent to the model
+tool_selector = ToolSelector(TOOLS)
+
 
 # Get OpenAI response
-def get_openai_response(messages, tools):
-    for attempt in range(3):
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4.1",
-                messages=messages,
-                tools=tools
+def get_openai_response(messages, tools, **options):
+    from openai import OpenAIError
+    try:
+        return call_with_retry(
+            "openai",
+            get_openai_client().chat.completions.create,
+            model=OPENAI_MODEL,
+            messages=messages,
+            tools=tools,
+            **options
+        )
+    except CircuitOpenError as e:
+        print(f"[FATAL] {e}. Exiting.")
+        sys.exit(1)
+    except OpenAIError as e:
+        print(f"[ERROR] OpenAI error: {e}")
+        sys.exit(1)
+
+async def get_openai_response_async(messages, tools, **options):
+    from openai import OpenAIError
+    try:
+        return await async_call_with_retry(
+            "openai",
+            get_async_openai_client().chat.completions.create,
+            model=OPENAI_MODEL,
+            messages=messages,
+            tools=tools,
+            **options
+        )
+    except (CircuitOpenError, OpenAIError) as e:
+        # Many prompts share the event loop; the failure belongs to this prompt only
+        print(f"[ERROR] OpenAI error: {e}")
+        raise
+
+# Stream the OpenAI response, handing each tool call over as soon as its arguments are complete
+def stream_openai_response(messages, tools, on_tool_call):
+    stream = get_openai_response(messages, tools, stream=True, stream_options={"include_usage": True})
+    content = []
+    tool_calls = {}
+    dispatched = set()
+    tokens = 0
+
+    def dispatch(index):
+        if index not in dispatched:
+            dispatched.add(index)
+            on_tool_call(index, tool_calls[index])
+
+    for chunk in stream:
+        if chunk.usage:
+            tokens = chunk.usage.total_tokens
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            content.append(delta.content)
+        for part in delta.tool_calls or []:
+            # A new index means every earlier tool call has been fully streamed
+            for index in tool_calls:
+                if index < part.index:
+                    dispatch(index)
+            tool_call = tool_calls.setdefault(
+                part.index,
+                SimpleNamespace(id=None, function=SimpleNamespace(name="", arguments=""))
+            )
+            if part.id:
+                tool_call.id = part.id
+            if part.function and part.function.name:
+                tool_call.function.name += part.function.name
+            if part.function and part.function.arguments:
+                tool_call.function.arguments += part.function.arguments
+                if tool_call.function.arguments.rstrip().endswith("}"):
+                    try:
+                        json.loads(tool_call.function.arguments)
+                    except json.JSONDecodeError:
+                        continue
+                    dispatch(part.index)
+
+    for index in sorted(tool_calls):
+        dispatch(index)
+
+    message = SimpleNamespace(
+        content="".join(content) or None,
+        tool_calls=[tool_calls[index] for index in sorted(tool_calls)] or None
+    )
+    return message, tokens
+
+SYSTEM_PROMPT = (
+    "You are an AI assistant integrated with Jira and Datadog. "
+    "If the user asks to create, update, delete, or log anything, "
+    "you must call the appropriate tool function. "
+    "Do not just reply with helpful text unless explicitly asked. "
+    "Always prefer tool use over plain responses when possible. "
+    "Once the task is complete, reply with a short plain-text summary."
+)
+
+
+def _token_counts(response):
+    usage = response.usage
+    if not usage:
+        return {}
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens
+    }
+
+
+def _assistant_message(message):
+    return {
+        "role": "assistant",
+        "content": message.content,
+        "tool_calls": [
+            {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {
+                    "name": tool_call.function.name,
+                    "arguments": tool_call.function.arguments
+                }
+            }
+            for tool_call in message.tool_calls
+        ]
+    }
+
+
+def _synthetic_message(tool_calls, source):
+    # Build a model-shaped message from tool calls resolved without the model
+    return SimpleNamespace(
+        content=None,
+        tool_calls=[
+            SimpleNamespace(
+                id=f"{source}_{index}",
+                function=SimpleNamespace(name=call["name"], arguments=call["arguments"])
             )
-            return response
-        except RateLimitError:
-            print(f"[WARN] Rate limit hit. Retrying in 5 seconds... ({attempt + 1}/3)")
-            time.sleep(5)
-        except OpenAIError as e:
-            print(f"[ERROR] OpenAI error: {e}")
-            sys.exit(1)
-    print("[FATAL] Rate limit persisted after retries. Exiting.")
-    sys.exit(1)
-
-# Prompt to OpenAI
-input_messages = [
-    {
-        "role": "system",
-        "content": (
-            "You are an AI assistant integrated with Jira and Datadog. "
-            "If the user asks to create, update, delete, or log anything, "
-            "you must call the appropriate tool function. "
-            "Do not just reply with helpful text unless explicitly asked. "
-            "Always prefer tool use over plain responses when possible."
+            for index, call in enumerate(tool_calls)
+        ]
+    )
+
+
+class AgentLoop:
+    """
+    Turn bookkeeping for one prompt, shared by run_agent and run_agent_async.
+
+    The callers do the I/O their own way (model requests, tool calls,
+    response cache reads and writes); this class decides what each turn
+    means and builds the conversation and the outcome.
+    """
+
+    def __init__(self, user_prompt, max_tokens, cached, use_router, result_budget):
+        with tracing.span("tool.select") as selecting:
+            self.selection = tool_selector.select(user_prompt)
+            selecting.set(tools=len(self.selection.tools), payload_bytes=self.selection.payload_bytes)
+        self.max_tokens = max_tokens
+        self.result_budget = result_budget
+        self.key = cache_key(OPENAI_MODEL, SYSTEM_PROMPT, user_prompt, self.selection.digest) if cached else None
+        self.routed_calls = router.route(user_prompt) if use_router else None
+        self.first_tool_calls = None
+        self.shortcut = None
+        self.messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+        self.turns = []
+        self.tool_results = []
+        self.total_tokens = 0
+        self.stop_reason = "max_turns"
+        self.reply = None
+        self.error = None
+
+    def checks_cache(self, turn):
+        return self.key is not None and turn == 1 and not self.routed_calls
+
+    def shortcut_message(self, turn, cached_calls):
+        # A model-shaped message when the turn is resolved without the model, else None
+        if turn == 1 and self.routed_calls:
+            # Structured command: the local router already knows the tool call
+            self.shortcut = "routed"
+            return _synthetic_message(self.routed_calls, "routed")
+        if cached_calls:
+            # Cache hit: run the previously resolved tool calls without asking the model
+            self.shortcut = "cached"
+            return _synthetic_message(cached_calls, "cached")
+        return None
+
+    def answered(self, turn, message, tokens, start):
+        """
+        Records the assistant message of a turn.
+        :return: True when it is the final plain-text reply
+        """
+        self.total_tokens += tokens
+        if not message.tool_calls:
+            self.reply = message.content
+            self.turns.append({"turn": turn, "tokens": tokens, "seconds": time.perf_counter() - start, "tool_calls": []})
+            self.stop_reason = "completed"
+            return True
+        if turn == 1:
+            self.first_tool_calls = [
+                {"name": tool_call.function.name, "arguments": tool_call.function.arguments}
+                for tool_call in message.tool_calls
+            ]
+        self.messages.append(_assistant_message(message))
+        return False
+
+    def cache_entry(self, turn):
+        # Only single-step resolutions are cached; later turns depend on tool results
+        return self.first_tool_calls if self.key is not None and turn == 2 else None
+
+    def failed(self, error):
+        self.stop_reason = "error"
+        self.error = str(error)
+
+    def add_results(self, turn, calls, tokens, start, first_action, on_result=None):
+        """
+        Adds a turn's tool results to the conversation, shaped to the token budget.
+        :param on_result: Called with each full result first (e.g. to print it)
+        :return: True when the run should stop here
+        """
+        self.tool_results.extend(calls)
+        with tracing.span("output.serialize", turn=turn):
+            for call in calls:
+                if on_result is not None:
+                    on_result(call)
+                self.messages.append({
+                    "role": "tool",
+                    "tool_call_id": call["tool_call_id"],
+                    "content": get_shaper().shape(call["name"], call["result"], self.result_budget // len(calls))
+                })
+
+        self.turns.append({
+            "turn": turn,
+            "tokens": tokens,
+            "seconds": time.perf_counter() - start,
+            "first_action_seconds": first_action,
+            "tool_calls": [call["name"] for call in calls]
+        })
+        if self.shortcut:
+            self.stop_reason = self.shortcut
+            return True
+        if self.total_tokens >= self.max_tokens:
+            self.stop_reason = "max_tokens"
+            return True
+        return False
+
+    def outcome(self):
+        outcome = {
+            "reply": self.reply,
+            "stop_reason": self.stop_reason,
+            "total_tokens": self.total_tokens,
+            "turns": self.turns,
+            "tool_results": self.tool_results,
+            "messages": self.messages
+        }
+        if self.error is not None:
+            outcome["error"] = self.error
+        return outcome
+
+
+def _streaming_caller(output_format, output):
+    # Listings go straight to the output page by page instead of being collected and printed at the end
+    def call(name, args):
+        if name == "get_issues":
+            return call_function("stream_issues", dict(args, output_format=output_format, stream=output))
+        return call_function(name, args)
+
+    return call
+
+
+def _print_tool_call(tool_call):
+    print(f"[INFO] Calling function: {tool_call.function.name} with args: {tool_call.function.arguments}")
+
+
+# Agent loop: feed tool results back until the model answers in plain text
+@tracing.traced("agent.run", root=True)
+def run_agent(user_prompt, max_turns=AGENT_MAX_TURNS, max_tokens=AGENT_MAX_TOKENS, function_caller=None,
+              use_cache=True, use_router=True, stream=OPENAI_STREAM, output_format=AGENT_OUTPUT_FORMAT,
+              result_budget=TOOL_RESULT_TOKEN_BUDGET, output=None, quiet=False):
+    # Tool results (the data) go to output; progress lines are printed to stdout.
+    # quiet prints neither (e.g. on the agent server, which returns results as JSON)
+    output = output or sys.stdout
+    function_caller = function_caller or (
+        call_function if output_format == "json" else _streaming_caller(output_format, output)
+    )
+    response_cache = get_response_cache() if use_cache else None
+    run = AgentLoop(user_prompt, max_tokens, response_cache is not None, use_router, result_budget)
+
+    def print_result(call):
+        # The full results are printed and kept in tool_results; the model gets them shaped to the budget
+        if isinstance(call["result"], dict) and "streamed" in call["result"]:
+            # Already written while it was fetched
+            print(f"[INFO] {call['result']['streamed']} issues from {call['name']} written to the output")
+            return
+        print(f"[INFO] Result from {call['name']}:")
+        write_result(call["result"], output, output_format)
+
+    for turn in range(1, max_turns + 1):
+        start = time.perf_counter()
+        calls = None
+        first_action = None
+        message = run.shortcut_message(turn, response_cache.get(run.key) if run.checks_cache(turn) else None)
+        tokens = 0
+        if message is None and stream:
+            dispatcher = StreamingDispatcher(function_caller)
+
+            def start_tool_call(index, tool_call):
+                nonlocal first_action
+                if first_action is None:
+                    first_action = time.perf_counter() - start
+                if not quiet:
+                    _print_tool_call(tool_call)
+                dispatcher.submit(index, tool_call)
+
+            with tracing.span("llm.request", model=OPENAI_MODEL, turn=turn, stream=True) as llm:
+                message, tokens = stream_openai_response(run.messages, run.selection.tools, start_tool_call)
+                llm.set(total_tokens=tokens)
+            router.record_llm_latency(time.perf_counter() - start)
+            # Tool calls started mid-stream; wait for them to finish
+            calls = dispatcher.results()
+        elif message is None:
+            with tracing.span("llm.request", model=OPENAI_MODEL, turn=turn) as llm:
+                response = get_openai_response(run.messages, run.selection.tools)
+                llm.set(**_token_counts(response))
+            router.record_llm_latency(time.perf_counter() - start)
+            message = response.choices[0].message
+            tokens = response.usage.total_tokens if response.usage else 0
+
+        if run.answered(turn, message, tokens, start):
+            entry = run.cache_entry(turn)
+            if entry:
+                response_cache.put(run.key, entry)
+            break
+
+        if calls is None:
+            first_action = time.perf_counter() - start
+            if not quiet:
+                for tool_call in message.tool_calls:
+                    _print_tool_call(tool_call)
+            calls = dispatch_tool_calls(message.tool_calls, function_caller)
+        if run.add_results(turn, calls, tokens, start, first_action, None if quiet else print_result):
+            break
+
+    return run.outcome()
+
+
+# Async agent loop: same budgets, router and cache as run_agent, on one event loop
+@tracing.traced("agent.run", root=True)
+async def run_agent_async(user_prompt, max_turns=AGENT_MAX_TURNS, max_tokens=AGENT_MAX_TOKENS, function_caller=None,
+                          use_cache=True, use_router=True, result_budget=TOOL_RESULT_TOKEN_BUDGET):
+    # asyncio is only imported by the async entry points; the sync CLI never needs it
+    import asyncio
+    function_caller = function_caller or call_function_async
+    # SQLite reads and writes run off the event loop, so other prompts keep going meanwhile
+    response_cache = await asyncio.to_thread(get_response_cache) if use_cache else None
+    run = AgentLoop(user_prompt, max_tokens, response_cache is not None, use_router, result_budget)
+
+    for turn in range(1, max_turns + 1):
+        start = time.perf_counter()
+        cached_calls = await asyncio.to_thread(response_cache.get, run.key) if run.checks_cache(turn) else None
+        message = run.shortcut_message(turn, cached_calls)
+        tokens = 0
+        if message is None:
+            try:
+                with tracing.span("llm.request", model=OPENAI_MODEL, turn=turn) as llm:
+                    response = await get_openai_response_async(run.messages, run.selection.tools)
+                    llm.set(**_token_counts(response))
+            except Exception as e:
+                run.failed(e)
+                break
+            router.record_llm_latency(time.perf_counter() - start)
+            message = response.choices[0].message
+            tokens = response.usage.total_tokens if response.usage else 0
+
+        if run.answered(turn, message, tokens, start):
+            entry = run.cache_entry(turn)
+            if entry:
+                await asyncio.to_thread(response_cache.put, run.key, entry)
+            break
+
+        first_action = time.perf_counter() - start
+        calls = await dispatch_tool_calls_async(message.tool_calls, function_caller)
+        if run.add_results(turn, calls, tokens, start, first_action):
+            break
+
+    return run.outcome()
+
+
+def print_outcome(outcome):
+    for turn in outcome["turns"]:
+        first_action = turn.get("first_action_seconds")
+        print(
+            f"[INFO] Turn {turn['turn']}: {len(turn['tool_calls'])} tool call(s), "
+            f"{turn['tokens']} tokens, {turn['seconds']:.2f}s"
+            + (f" (first action after {first_action:.2f}s)" if first_action is not None else "")
         )
-    },
-    {"role": "user", "content": user_prompt}
-]
 
-response = get_openai_response(input_messages, TOOLS)
-message = response.choices[0].message
+    # Defensive check
+    if len(outcome["turns"]) == 1 and not outcome["turns"][0]["tool_calls"]:
+        print("[ERROR] No tool call was returned by the model. Try rephrasing your prompt.")
+        print("AI replied with:", outcome["reply"])
+        sys.exit(1)
+
+    if outcome.get("error"):
+        print(f"[ERROR] {outcome['error']}")
+    elif outcome["stop_reason"] == "cached":
+        print("[INFO] Served from the response cache; the model was not called.")
+    elif outcome["stop_reason"] == "routed":
+        print("[INFO] Handled by the local intent router; the model was not called.")
+    elif outcome["stop_reason"] != "completed":
+        print(f"[WARN] Agent stopped early ({outcome['stop_reason']}) after {outcome['total_tokens']} tokens.")
+    elif outcome["reply"]:
+        print(outcome["reply"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Talk to Jira and Datadog in plain English.")
+    parser.add_argument("prompt", nargs="?", help="The natural-language request")
+    parser.add_argument(
+        "--server",
+        default=agent_client.AGENT_SERVER_URL,
+        help="Send the prompt to a running agent_server.py (http://host:port or unix:/path)"
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report import time of the CLI and each backend (via -X importtime) and exit"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always ask the model, ignoring the response cache")
+    parser.add_argument("--no-router", action="store_true", help="Send structured commands to the model too")
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Print where the request's wall time went (set TRACE_EXPORT_PATH to also write OTLP/JSON spans)"
+    )
+    parser.add_argument(
+        "--output",
+        choices=OUTPUT_FORMATS,
+        default=AGENT_OUTPUT_FORMAT,
+        help="How tool results are printed: indented json, or ndjson/csv with one item per line"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=OPENAI_STREAM,
+        help="Stream the model response and start each tool call as soon as its arguments arrive"
+    )
+    options = parser.parse_args()
+
+    if options.profile_startup:
+        import startup_profile
+        report = startup_profile.profile_startup()
+        startup_profile.print_report(report)
+        sys.exit(0 if report["within_budget"] else 1)
+
+    if not options.prompt:
+        parser.error("a prompt is required")
+
+    # ndjson and csv keep stdout for data lines, so they can be piped into a parser
+    output = sys.stdout
+    with contextlib.redirect_stdout(sys.stdout if options.output == "json" else sys.stderr):
+        if options.server:
+            outcome = agent_client.send_prompt(options.prompt, options.server,
+                                               use_cache=not options.no_cache, use_router=not options.no_router)
+            if "error" in outcome:
+                print(f"[ERROR] {outcome['error']}")
+                sys.exit(1)
+            for call in outcome["tool_results"]:
+                print(f"[INFO] Result from {call['name']}:")
+                write_result(call["result"], output, options.output)
+        else:
+            outcome = run_agent(options.prompt, use_cache=not options.no_cache, use_router=not options.no_router,
+                                stream=options.stream, output_format=options.output, output=output)
 
-# Defensive check
-if not hasattr(message, "tool_calls") or message.tool_calls is None:
-    print("[ERROR] No tool call was returned by the model. Try rephrasing your prompt.")
-    print("AI replied with:", message.content)
-    sys.exit(1)
+        print_outcome(outcome)
+        if options.trace:
+            if options.server:
+                print("[WARN] --trace only covers prompts run in this process, not on the agent server.")
+            else:
+                tracing.print_summary(tracing.last_trace())
 
-# Execute tool call
-tool_call = message.tool_calls[0]
-name = tool_call.function.name
-args = json.loads(tool_call.function.arguments)
 
-print(f"[INFO] Calling function: {name} with args: {args}")
-result = call_function(name, args)
-print(json.dumps(result, indent=2))
+if __name__ == "__main__":
+    main()
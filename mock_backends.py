@@ -0,0 +1,252 @@
+import re
+import json
+import time
+import random
+import socket
+import threading
+from collections import Counter
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-ins for the OpenAI, Jira and Datadog HTTP APIs, used by benchmark.py,
+# and for a Datadog agent's DogStatsD port, used by the tests.
+# Each backend gets its own server so latency and error rates can be set per backend.
+
+MOCK_ISSUE_COUNT = 120
+MOCK_TRANSITIONS = [
+    {"id": "11", "name": "Start", "to": {"name": "In Progress"}},
+    {"id": "31", "name": "Finish", "to": {"name": "Done"}}
+]
+JIRA_API_PATH = re.compile(r"^/rest/api/(?:2|3|latest)/(.*)$")
+ISSUE_KEY = re.compile(r"(?<=/issue/)(?!bulk$)[^/]+")
+
+
+class BackendConfig:
+    def __init__(self, latency_ms=0.0, error_rate=0.0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+
+
+def _issue(key, base_url):
+    number = key.rsplit("-", 1)[-1]
+    return {
+        "id": number if number.isdigit() else "1",
+        "key": key,
+        "self": f"{base_url}/rest/api/2/issue/{key}",
+        "fields": {
+            "summary": f"Benchmark issue {key}",
+            "description": "Generated by mock_backends",
+            "issuetype": {"name": "Task"},
+            "updated": "2024-01-01T00:00:00.000+0000"
+        }
+    }
+
+
+def _chat_completion(body):
+    # Turn 1: pick a tool from keywords in the prompt; once a tool result is present, answer in text
+    messages = body.get("messages", [])
+    text = next((m.get("content") or "" for m in messages if m.get("role") == "user"), "")
+    prompt = text.lower()
+    usage = {"prompt_tokens": len(json.dumps(messages)) // 4, "completion_tokens": 20}
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+    if messages and messages[-1].get("role") == "tool":
+        message = {"role": "assistant", "content": "Done.", "tool_calls": None}
+        finish_reason = "stop"
+    else:
+        match = re.search(r"\b[A-Z][A-Z0-9]+-\d+\b", text)
+        key = match.group(0) if match else "BENCH-1"
+        if "create" in prompt:
+            name, args = "create_issue", {"project": "BENCH", "summary": text[:60], "description": text, "issue_type": "Task"}
+        elif "list" in prompt:
+            name, args = "get_issues", {"project": "BENCH"}
+        elif "move" in prompt:
+            name, args = "transition_issue", {"issue_id": key, "status": "Done"}
+        elif "log" in prompt:
+            name, args = "log_event", {"title": text[:60], "text": text, "alert_type": "info", "tags": ["bench"]}
+        else:
+            name, args = "get_issue", {"issue_id": key}
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"call_{random.getrandbits(32):08x}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(args)}
+            }]
+        }
+        finish_reason = "tool_calls"
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": usage
+    }
+
+
+def _jira_response(method, path, query, body, base_url):
+    if path in ("serverInfo", "myself"):
+        return 200, {"baseUrl": base_url, "version": "9.0.0", "versionNumbers": [9, 0, 0], "deploymentType": "Server",
+                     "accountId": "mock", "name": "mock"}
+    if path.startswith("search"):
+        params = dict(query, **(body or {}))
+        start = int(_first(params.get("startAt", 0)))
+        limit = int(_first(params.get("maxResults", 50)))
+        keys = [f"BENCH-{number}" for number in range(start + 1, min(start + limit, MOCK_ISSUE_COUNT) + 1)]
+        return 200, {"startAt": start, "maxResults": limit, "total": MOCK_ISSUE_COUNT,
+                     "isLast": start + limit >= MOCK_ISSUE_COUNT, "issues": [_issue(key, base_url) for key in keys]}
+    if path == "issue" and method == "POST":
+        return 201, {"id": "1001", "key": "BENCH-1001", "self": f"{base_url}/rest/api/2/issue/1001"}
+    if path == "issue/bulk" and method == "POST":
+        updates = (body or {}).get("issueUpdates", [])
+        return 201, {"issues": [{"id": str(2000 + index), "key": f"BENCH-{2000 + index}"} for index in range(len(updates))],
+                     "errors": []}
+    match = re.fullmatch(r"issue/([^/]+)(?:/(comment|transitions))?", path)
+    if not match:
+        return 404, {"errorMessages": [f"Unknown path {path}"]}
+    key, resource = match.groups()
+    if resource == "comment":
+        return 200, {"comments": [{"id": "1", "body": "First"}, {"id": "2", "body": "Second"}], "total": 2}
+    if resource == "transitions":
+        if method == "POST":
+            return 204, None
+        return 200, {"transitions": MOCK_TRANSITIONS}
+    if method in ("PUT", "DELETE"):
+        return 204, None
+    issue = _issue(key, base_url)
+    if "transitions" in _first(query.get("expand", [""])):
+        issue["transitions"] = MOCK_TRANSITIONS
+    return 200, issue
+
+
+def _datadog_response(path):
+    if path.endswith("/events"):
+        return 202, {"status": "ok", "event": {"id": random.getrandbits(32)}}
+    return 202, {"status": "ok"}
+
+
+def _first(value):
+    return value[0] if isinstance(value, list) else value
+
+
+class MockServer:
+    """One threaded HTTP server standing in for a backend ("openai", "jira" or "datadog")."""
+
+    def __init__(self, backend, config=None, host="127.0.0.1", port=0):
+        self.backend = backend
+        self.config = config or BackendConfig()
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name=f"mock-{self.backend}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else None
+                except json.JSONDecodeError:
+                    body = None
+                url = urlparse(self.path)
+                with mock._lock:
+                    mock.requests[f"{self.command} {ISSUE_KEY.sub('{key}', url.path)}"] += 1
+
+                if mock.config.latency_ms:
+                    time.sleep(mock.config.latency_ms * random.uniform(0.5, 1.5) / 1000)
+                if mock.config.error_rate and random.random() < mock.config.error_rate:
+                    self._send(503, {"error": "injected failure"})
+                    return
+
+                if mock.backend == "openai":
+                    self._send(200, _chat_completion(body or {}))
+                elif mock.backend == "jira":
+                    match = JIRA_API_PATH.match(url.path)
+                    if not match:
+                        self._send(404, {"errorMessages": [f"Unknown path {url.path}"]})
+                        return
+                    self._send(*_jira_response(self.command, match.group(1), parse_qs(url.query), body, mock.url))
+                else:
+                    self._send(*_datadog_response(url.path))
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def _send(self, status, payload):
+                data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+class MockDogStatsD:
+    """UDP stand-in for a local Datadog agent: a socket on a free port that hands back what it receives."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+
+    @property
+    def host(self):
+        return self.socket.getsockname()[0]
+
+    @property
+    def port(self):
+        return self.socket.getsockname()[1]
+
+    def receive(self, count=1, timeout=2.0):
+        """
+        Waits for datagrams.
+        :param count: Number of payloads to wait for
+        :param timeout: Seconds to wait for each one
+        :return: The payload lines, decoded (a buffering client can pack several into one datagram)
+        """
+        self.socket.settimeout(timeout)
+        lines = []
+        for _ in range(count):
+            data, _ = self.socket.recvfrom(65535)
+            lines.extend(data.decode("utf-8").splitlines())
+        return lines
+
+    def close(self):
+        self.socket.close()
+
+
+def start_mock_backends(configs=None):
+    """
+    Starts one mock server per backend.
+    :param configs: Optional {backend: BackendConfig} with injected latency and error rate
+    :return: {backend: MockServer}
+    """
+    configs = configs or {}
+    return {
+        backend: MockServer(backend, configs.get(backend)).start()
+        for backend in ("openai", "jira", "datadog")
+    }
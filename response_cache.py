@@ -0,0 +1,101 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Persistent cache of prompt -> tool calls; set RESPONSE_CACHE_PATH empty to disable
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", ".response_cache.sqlite3")
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+# Resolutions that call any of these tools are never cached
+RESPONSE_CACHE_SKIP_TOOLS = set(
+    name.strip() for name in os.getenv("RESPONSE_CACHE_SKIP_TOOLS", "delete_issue").split(",") if name.strip()
+)
+
+
+def normalize_prompt(prompt):
+    # Case is kept: it can be part of the tool arguments (summaries, JQL values)
+    return re.sub(r"\s+", " ", prompt).strip().rstrip(".!?").rstrip()
+
+
+def tools_hash(tools):
+    return hashlib.sha256(json.dumps(tools, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def cache_key(model, system_prompt, user_prompt, tools_digest):
+    # tools_digest is tools_hash() of the exact tool list sent with the prompt
+    material = json.dumps([model, system_prompt, normalize_prompt(user_prompt), tools_digest])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded LRU cache with TTL, stored in SQLite so it survives across runs."""
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_SIZE,
+                 skip_tools=RESPONSE_CACHE_SKIP_TOOLS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.skip_tools = skip_tools
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, tool_calls TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        """
+        Looks up previously resolved tool calls.
+        :param key: The key from cache_key()
+        :return: A list of {"name", "arguments"} dicts, or None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT tool_calls, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] >= self.ttl:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, tool_calls):
+        if any(call["name"] in self.skip_tools for call in tool_calls):
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, tool_calls, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(tool_calls), now, now)
+            )
+            # Drop expired entries, then the least recently used beyond the size bound
+            self._db.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,))
+            self._db.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _cache
+    if not RESPONSE_CACHE_PATH:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,191 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+from issue_records import json_default
+
+try:
+    import tiktoken
+except ImportError:  # Optional; token counts fall back to ~4 characters per token
+    tiktoken = None
+
+# Tokens of tool results sent back to the model per turn, shared by that turn's tool calls
+TOOL_RESULT_TOKEN_BUDGET = int(os.getenv("TOOL_RESULT_TOKEN_BUDGET", "4000"))
+# Longest string kept in a field of a shaped result
+TOOL_RESULT_MAX_CHARS = int(os.getenv("TOOL_RESULT_MAX_CHARS", "1000"))
+# Full results kept in memory so the model can page through them
+TOOL_RESULT_STORE_SIZE = int(os.getenv("TOOL_RESULT_STORE_SIZE", "64"))
+
+# Fields kept per list item when a result is too big to send whole
+TOOL_RESULT_FIELDS = {
+    "get_issues": ("key", "summary", "type"),
+    "search_issues": ("key", "summary", "score"),
+    "get_issue_comments": ("id", "body"),
+    "get_issue_transitions": ("id", "name", "to"),
+    "bulk_create_issues": ("index", "key", "error"),
+    "bulk_update_issues": ("index", "key", "error"),
+    "bulk_transition_issues": ("index", "key", "error"),
+}
+# Tokens held back for the page envelope and cursor note
+PAGE_OVERHEAD_TOKENS = 60
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def count_tokens(text):
+    global _encoding
+    if tiktoken is None:
+        return len(text) // 4 + 1
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                _encoding = tiktoken.encoding_for_model(os.getenv("OPENAI_MODEL", "gpt-4.1"))
+            except KeyError:
+                _encoding = tiktoken.get_encoding("o200k_base")
+    return len(_encoding.encode(text))
+
+
+def _dumps(value):
+    return json.dumps(value, default=json_default, separators=(",", ":"))
+
+
+def _clip(value, max_chars):
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + f"... [{len(value) - max_chars} more characters]"
+    if isinstance(value, dict):
+        return {key: _clip(item, max_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clip(item, max_chars) for item in value]
+    return value
+
+
+def _project(item, fields):
+    if fields is None or not hasattr(item, "get"):
+        return item
+    return {name: item.get(name) for name in fields if item.get(name) is not None}
+
+
+def _list_of(result):
+    # The list inside a tool result ("issues", "comments", "results", ...)
+    if isinstance(result, dict):
+        for key, value in result.items():
+            if isinstance(value, list):
+                return key, value
+    return None, None
+
+
+class ResultShaper:
+    """
+    Fits tool results into the model's per-turn token budget.
+
+    Results under budget pass through unchanged. Larger ones have list items
+    cut down to the tool's key fields, long strings clipped, and are split
+    into pages; the full result stays here and get_result_page serves the
+    rest by cursor, without calling Jira again.
+    """
+
+    def __init__(self, budget=TOOL_RESULT_TOKEN_BUDGET, max_chars=TOOL_RESULT_MAX_CHARS,
+                 store_size=TOOL_RESULT_STORE_SIZE):
+        self.budget = budget
+        self.max_chars = max_chars
+        self.store_size = store_size
+        self._results = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def shape(self, name, result, budget=None):
+        """
+        Serializes a tool result for the conversation.
+        :param name: The tool that produced it
+        :param result: The full result
+        :param budget: Token budget for this result (defaults to the whole turn budget)
+        :return: The message content; JSON within budget where possible
+        """
+        budget = budget or self.budget
+        text = _dumps(result)
+        if count_tokens(text) <= budget:
+            return text
+
+        list_key, items = _list_of(result)
+        if items is None:
+            # Nothing to page through: clip strings harder until it fits
+            max_chars = self.max_chars
+            while True:
+                text = _dumps(_clip(result, max_chars))
+                if count_tokens(text) <= budget or max_chars <= 50:
+                    return text
+                max_chars //= 2
+
+        with self._lock:
+            self._next_id += 1
+            result_id = f"r{self._next_id}"
+            self._results[result_id] = (name, result, list_key)
+            while len(self._results) > self.store_size:
+                self._results.popitem(last=False)
+        return _dumps(self._page(result_id, name, result, list_key, 0, budget))
+
+    def page(self, cursor, budget=None):
+        try:
+            # "<id>:<offset>:<budget>"; older cursors carry no budget
+            result_id, offset, *carried = cursor.split(":", 2)
+            offset = int(offset)
+            carried = int(carried[0]) if carried else None
+        except (AttributeError, ValueError, IndexError):
+            return {"error": f"Invalid cursor '{cursor}'"}
+        with self._lock:
+            stored = self._results.get(result_id)
+        if stored is None:
+            return {"error": "This cursor has expired; call the original tool again"}
+        name, result, list_key = stored
+        return self._page(result_id, name, result, list_key, offset, budget or carried or self.budget)
+
+    def _page(self, result_id, name, result, list_key, offset, budget):
+        items = result[list_key]
+        fields = TOOL_RESULT_FIELDS.get(name)
+        page = []
+        used = PAGE_OVERHEAD_TOKENS
+        for item in items[offset:]:
+            shaped = _clip(_project(item, fields), self.max_chars)
+            tokens = count_tokens(_dumps(shaped)) + 1
+            # Always make progress, even if one item alone is over budget
+            if page and used + tokens > budget:
+                break
+            page.append(shaped)
+            used += tokens
+
+        end = offset + len(page)
+        shaped = {key: value for key, value in result.items() if key != list_key}
+        shaped[list_key] = page
+        shaped["page"] = {
+            "showing": f"{offset + 1}-{end}" if page else "none",
+            "total": len(items),
+            "fields": list(fields) if fields else None,
+            "cursor": f"{result_id}:{end}:{budget}" if end < len(items) else None,
+            "note": (
+                f"Showing {len(page)} of {len(items):,}; call get_result_page with the cursor for more."
+                if end < len(items) else f"Last page; {len(items):,} in total."
+            )
+        }
+        return shaped
+
+
+_shaper = None
+_shaper_lock = threading.Lock()
+
+
+def get_shaper():
+    global _shaper
+    with _shaper_lock:
+        if _shaper is None:
+            _shaper = ResultShaper()
+    return _shaper
+
+
+def get_result_page(cursor: str) -> dict:
+    # Served from the locally kept full result; no backend is called
+    return get_shaper().page(cursor)
+
+
+async def get_result_page_async(cursor: str) -> dict:
+    return get_result_page(cursor)
@@ -0,0 +1,260 @@
+import os
+import re
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Statuses worth retrying; non-idempotent calls are only retried when the request was rejected outright
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+REJECTED_STATUSES = {429}
+# Transient client-side failures, matched by name so no backend library has to be imported here
+TRANSIENT_ERRORS = {
+    "ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout", "APIConnectionError", "APITimeoutError",
+    "ConnectError", "PoolTimeout", "RemoteProtocolError",
+    # The Datadog client wraps connection failures and timeouts in its own exceptions
+    "ClientError", "HttpTimeout"
+}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        # Takes a token, returning how long the caller must wait for it
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        if self.rate <= 0:
+            return
+        wait = self._reserve()
+        if wait:
+            import asyncio
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        # Server asked us to back off: drain the bucket so every caller slows down
+        with self._lock:
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and lets one trial call through after `reset_timeout`."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self, name):
+        # Returns True when this call is the half-open trial; the caller must then call end_trial()
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                raise CircuitOpenError(f"{name} circuit is open after {self._failures} consecutive failures")
+            self._trial_running = True
+            return True
+
+    def end_trial(self):
+        # Runs after every trial, whatever its outcome; an unrecorded trial (e.g. cancelled) lets the next call try
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class Backend:
+    def __init__(self, name):
+        prefix = name.upper()
+        self.name = name
+        self.max_retries = int(os.getenv(f"{prefix}_MAX_RETRIES", "4"))
+        self.base_delay = float(os.getenv(f"{prefix}_RETRY_BASE_DELAY", "0.5"))
+        self.max_delay = float(os.getenv(f"{prefix}_RETRY_MAX_DELAY", "30"))
+        self.bucket = TokenBucket(
+            float(os.getenv(f"{prefix}_RATE_LIMIT", "10")),
+            float(os.getenv(f"{prefix}_RATE_BURST", "0")) or None
+        )
+        self.breaker = CircuitBreaker(
+            int(os.getenv(f"{prefix}_BREAKER_THRESHOLD", "5")),
+            float(os.getenv(f"{prefix}_BREAKER_RESET", "30"))
+        )
+
+
+BACKENDS = {name: Backend(name) for name in ("openai", "jira", "datadog")}
+
+
+def _status_of(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _parse_duration(value):
+    # OpenAI reset headers look like "1s", "250ms" or "6m0s"
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * units[unit] for number, unit in re.findall(r"([\d.]+)(ms|s|m|h)", value))
+
+
+def retry_after(error):
+    """
+    Reads how long the server asked us to wait.
+    :param error: The exception raised by the backend client
+    :return: Seconds to wait, or None if the response says nothing usable
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("Retry-After")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        # Rate-limit reset headers come with every response; they only say how long to wait after a 429
+        if _status_of(error) != 429:
+            return None
+        for header in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+            if headers.get(header):
+                return _parse_duration(headers[header])
+        value = headers.get("X-RateLimit-Reset")
+        if value:
+            try:
+                # Datadog sends seconds until reset
+                return max(0.0, float(value))
+            except ValueError:
+                # Jira sends an ISO 8601 timestamp
+                reset = datetime.fromisoformat(value.replace("Z", "+00:00"))
+                return max(0.0, (reset - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        # A malformed header: fall back to backoff
+        return None
+    return None
+
+
+def is_retryable(error, idempotent=True):
+    status = _status_of(error)
+    if status is not None:
+        return status in (RETRYABLE_STATUSES if idempotent else REJECTED_STATUSES)
+    return idempotent and type(error).__name__ in TRANSIENT_ERRORS
+
+
+def backoff_delay(backend, attempt, error):
+    delay = retry_after(error)
+    if delay is None:
+        # Exponential backoff with full jitter
+        delay = random.uniform(0, min(backend.max_delay, backend.base_delay * 2 ** attempt))
+    return min(delay, backend.max_delay)
+
+
+def _handle_failure(backend, error, idempotent, attempt):
+    # Updates the breaker and returns how long to wait before retrying, or None to give up
+    status = _status_of(error)
+    if (status is not None and status >= 500) or (status is None and type(error).__name__ in TRANSIENT_ERRORS):
+        backend.breaker.record_failure()
+    else:
+        # A 4xx (429 included) or a client-side bug is not an outage; the backend is up
+        backend.breaker.record_success()
+    if not is_retryable(error, idempotent) or attempt == backend.max_retries:
+        return None
+
+    delay = backoff_delay(backend, attempt, error)
+    print(f"[WARN] {backend.name} call failed ({error}); retrying in {delay:.1f}s ({attempt + 1}/{backend.max_retries})")
+    if status == 429 and backend.bucket.rate > 0:
+        # Throttle every caller of this backend; the next acquire waits it out
+        backend.bucket.pause(delay)
+        return 0.0
+    return delay
+
+
+def call_with_retry(backend_name, func, *args, idempotent=True, **kwargs):
+    """
+    Calls a backend through its rate limiter, circuit breaker and retry policy.
+    :param backend_name: "openai", "jira" or "datadog"
+    :param func: The client call to make
+    :param idempotent: False for calls that must not be repeated unless the server rejected them
+    :return: Whatever func returns; the last error is re-raised once retries are exhausted
+    """
+    backend = BACKENDS[backend_name]
+    for attempt in range(backend.max_retries + 1):
+        trial = backend.breaker.before_call(backend.name)
+        try:
+            backend.bucket.acquire()
+            result = func(*args, **kwargs)
+        except Exception as e:
+            delay = _handle_failure(backend, e, idempotent, attempt)
+            if delay is None:
+                raise
+        else:
+            backend.breaker.record_success()
+            return result
+        finally:
+            if trial:
+                backend.breaker.end_trial()
+        time.sleep(delay)
+
+
+async def async_call_with_retry(backend_name, func, *args, idempotent=True, **kwargs):
+    """
+    Async counterpart of call_with_retry for coroutine functions.
+    :param backend_name: "openai", "jira" or "datadog"
+    :param func: The coroutine function to await
+    :param idempotent: False for calls that must not be repeated unless the server rejected them
+    :return: Whatever func returns; the last error is re-raised once retries are exhausted
+    """
+    backend = BACKENDS[backend_name]
+    for attempt in range(backend.max_retries + 1):
+        trial = backend.breaker.before_call(backend.name)
+        try:
+            await backend.bucket.acquire_async()
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            delay = _handle_failure(backend, e, idempotent, attempt)
+            if delay is None:
+                raise
+        else:
+            backend.breaker.record_success()
+            return result
+        finally:
+            if trial:
+                backend.breaker.end_trial()
+        import asyncio
+        await asyncio.sleep(delay)
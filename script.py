@@ -1,14 +1,16 @@
-from jira_functions import create_jira_issue, get_jira_issue, update_jira_issue, transition_jira_issue
+import os
+from jira_functions import create_issue, get_issue, update_issue, transition_issue
 
 # Example usage
-issue_key = create_jira_issue("Test Summary", "Test Description")
-print("Created issue:", issue_key)
+created = create_issue(os.environ.get("JIRA_PROJECT_KEY"), "Test Summary", "Test Description", "Task")
+issue_key = created.get("key")
+print("Created issue:", created)
 
-issue = get_jira_issue(issue_key)
+issue = get_issue(issue_key=issue_key)
 print("Fetched issue:", issue)
 
-update_jira_issue(issue_key, {"summary": "Updated Summary"})
+update_issue(issue_key=issue_key, summary="Updated Summary")
 print("Updated issue summary.")
 
-transition_jira_issue(issue_key, "Done")
-print("Transitioned issue to Done.")
\ No newline at end of file
+print(transition_issue(issue_key=issue_key, status="Done"))
+print("Transitioned issue to Done.")
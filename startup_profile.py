@@ -0,0 +1,88 @@
+import os
+import sys
+import subprocess
+
+# Cold-start budget for the CLI, in milliseconds of import time
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "250"))
+
+# What a prompt pays before its first request, and what each backend adds when first used
+PROFILE_TARGETS = {
+    "cli": "import main",
+    "openai": "import openai",
+    "jira": "import jira_functions",
+    "datadog": "import datadog_functions",
+}
+
+
+def _import_times(statement):
+    # -X importtime writes "import time: self [us] | cumulative | imported package" to stderr
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented two spaces per level after the separator
+        name = name[1:].rstrip()
+        modules.append((name.strip(), (len(name) - len(name.lstrip())) // 2, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def _with_importer(modules):
+    # Children are listed before their parent, so walking backwards meets each parent first
+    importers = {}
+    result = []
+    for name, depth, self_us, cumulative_us in reversed(modules):
+        importers[depth] = name
+        result.append((name, importers[0] if depth else None, depth, self_us, cumulative_us))
+    return result[::-1]
+
+
+def _entry(name, via, self_us, cumulative_us):
+    entry = {"module": name, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative_us / 1000, 1)}
+    if via:
+        entry["via"] = via
+    return entry
+
+
+def profile_startup(top=10):
+    """
+    Measures import time of the CLI and of each lazily loaded backend.
+    :param top: Number of slowest imports listed per target, by self and by cumulative time
+    :return: A report dict; "within_budget" compares the CLI against STARTUP_BUDGET_MS
+    """
+    report = {"budget_ms": STARTUP_BUDGET_MS, "targets": {}}
+    for target, statement in PROFILE_TARGETS.items():
+        modules = _with_importer(_import_times(statement))
+        # Nested imports are ranked too, so the dependency that is actually slow gets named
+        nested = [module for module in modules if module[2] > 0]
+        report["targets"][target] = {
+            "total_ms": round(sum(module[4] for module in modules if module[2] == 0) / 1000, 1),
+            "slowest": [
+                _entry(name, via, self_us, cumulative_us)
+                for name, via, _, self_us, cumulative_us in sorted(modules, key=lambda module: module[3], reverse=True)[:top]
+            ],
+            "slowest_cumulative": [
+                _entry(name, via, self_us, cumulative_us)
+                for name, via, _, self_us, cumulative_us in sorted(nested, key=lambda module: module[4], reverse=True)[:top]
+            ]
+        }
+    report["within_budget"] = report["targets"]["cli"]["total_ms"] <= STARTUP_BUDGET_MS
+    return report
+
+
+def print_report(report):
+    for target, timing in report["targets"].items():
+        print(f"[INFO] {target}: {timing['total_ms']} ms")
+        for title, key, field in (("self", "slowest", "self_ms"), ("cumulative", "slowest_cumulative", "cumulative_ms")):
+            print(f"       slowest by {title} time:")
+            for module in timing[key]:
+                via = f" (via {module['via']})" if "via" in module else ""
+                print(f"         {module[field]:>8} ms  {module['module']}{via}")
+    status = "within" if report["within_budget"] else "OVER"
+    print(f"[INFO] CLI cold start is {status} the {report['budget_ms']} ms budget")
@@ -0,0 +1,38 @@
+import json
+
+import batch
+import main
+
+
+def write_prompts(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for number in range(1, count + 1):
+            f.write(json.dumps({"id": str(number), "prompt": f"prompt {number}"}) + "\n")
+
+
+def test_prompts_whose_tool_calls_all_failed_are_retried(tmp_path, monkeypatch):
+    input_path, output_path = str(tmp_path / "in.jsonl"), str(tmp_path / "out.jsonl")
+    write_prompts(input_path, 3)
+    jira_down = True
+
+    def run_agent(prompt, function_caller=None):
+        # Prompt 2 also makes a call that always works; prompt 3 only calls the flaky backend
+        calls = [("get_issue", {"issue_id": "OPS-1"})] + ([("search_issues", {"query": "x"})] if prompt == "prompt 2" else [])
+        results = [
+            {"name": name, "result": {"error": "Jira is down"} if jira_down and name == "get_issue" else {"key": "OPS-1"}}
+            for name, _ in calls
+        ]
+        if prompt == "prompt 1":
+            results = []
+        return {"reply": "ok", "stop_reason": "completed", "tool_results": results, "messages": []}
+
+    monkeypatch.setattr(main, "run_agent", run_agent)
+    assert batch.run_batch(input_path, output_path, workers=2) == {"processed": 2, "skipped": 0, "failed": 1}
+    failed, = [json.loads(line) for line in open(output_path) if "error" in json.loads(line)]
+    assert failed["id"] == "3" and failed["error"] == "Every tool call failed: Jira is down"
+
+    jira_down = False
+    assert batch.run_batch(input_path, output_path, workers=2) == {"processed": 1, "skipped": 2, "failed": 0}
+    records = [json.loads(line) for line in open(output_path)]
+    assert sorted(record["id"] for record in records) == ["1", "2", "3"]
+    assert not any("error" in record for record in records)
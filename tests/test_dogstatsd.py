@@ -0,0 +1,77 @@
+import pytest
+from datadog.dogstatsd import DogStatsd
+
+import datadog_functions
+from mock_backends import MockDogStatsD
+
+SENT = {"status": "sent", "transport": "dogstatsd"}
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    agent = MockDogStatsD()
+    monkeypatch.setattr(
+        datadog_functions, "statsd", DogStatsd(host=agent.host, port=agent.port, disable_telemetry=True)
+    )
+    yield agent
+    agent.close()
+
+
+@pytest.mark.parametrize("metric_type, value, datagram", [
+    ("gauge", 3, "jira.sync.lag:3|g|#env:test,team:ops"),
+    ("count", 2, "jira.sync.lag:2|c|#env:test,team:ops"),
+    # A rate is per second: DogStatsD gets the count over DATADOG_RATE_INTERVAL (10 s)
+    ("rate", 2, "jira.sync.lag:20|c|#env:test,team:ops"),
+    ("distribution", 0.25, "jira.sync.lag:0.25|d|#env:test,team:ops"),
+    ("histogram", 7, "jira.sync.lag:7|h|#env:test,team:ops"),
+])
+def test_metric_datagram(agent, metric_type, value, datagram):
+    assert datadog_functions.send_custom_metric("jira.sync.lag", value, ["env:test", "team:ops"], metric_type) == SENT
+    assert agent.receive() == [datagram]
+
+
+def test_event_datagram(agent):
+    assert datadog_functions.log_event("Deploy failed", "Rollback started", "error", ["env:test"]) == SENT
+    assert agent.receive() == ["_e{13,16}:Deploy failed|Rollback started|t:error|#env:test"]
+
+
+@pytest.mark.parametrize("status, code", [
+    ("ok", 0), ("warning", 1), ("critical", 2), ("unknown", 3), ("CRITICAL", 2), (1, 1), ("3", 3),
+])
+def test_service_check_datagram_converts_status(agent, status, code):
+    assert datadog_functions.send_service_check("jira.reachable", status, ["env:test"]) == SENT
+    assert agent.receive() == [f"_sc|jira.reachable|{code}|#env:test"]
+
+
+def test_buffered_rate_matches_direct_rate(agent):
+    # 2 per second over a 10 s window, as the metrics buffer hands it over
+    metric = {"metric": "jira.sync.lag", "points": [(0, 2)], "tags": ["env:test"], "type": "rate", "interval": 10}
+    datadog_functions._send_batch([metric], [])
+    datadog_functions.send_custom_metric("jira.sync.lag", 2, ["env:test"], "rate")
+    assert agent.receive(2) == ["jira.sync.lag:20|c|#env:test"] * 2
+
+
+def test_http_fallback_only_sends_unsent_points(agent, monkeypatch):
+    statsd = datadog_functions.statsd
+    sent = []
+
+    def gauge(metric_name, value, tags=None):
+        if len(sent) == 1:
+            raise OSError("agent went away")
+        sent.append(metric_name)
+        statsd.__class__.gauge(statsd, metric_name, value, tags=tags)
+
+    http = []
+    monkeypatch.setattr(statsd, "gauge", gauge)
+    monkeypatch.setattr(datadog_functions, "_send", lambda func, **kwargs: http.append(kwargs))
+    metrics = [
+        {"metric": f"queue.depth.{n}", "points": [(0, n)], "tags": [], "type": "gauge"} for n in range(3)
+    ]
+    distributions = [{"metric": "jira.latency", "points": [(0, [0.1, 0.2])], "tags": []}]
+    datadog_functions._send_batch(metrics, distributions)
+
+    assert agent.receive() == ["queue.depth.0:0|g"]
+    assert [metric["metric"] for metric in http[0]["metrics"]] == ["queue.depth.1", "queue.depth.2"]
+    assert http[1]["distributions"] == distributions
+    # The caller's batch is left as it was
+    assert len(metrics) == 3 and metrics[0]["points"] == [(0, 0)]
@@ -0,0 +1,21 @@
+import pytest
+
+from intent_router import IntentRouter
+
+
+@pytest.mark.parametrize("prompt, confidence", [
+    ("Move OPS-12 to In Progress", 1.0),
+    ("move issue ops-12 to 'In Progress'.", 1.0),
+    ("Right after lunch, please move OPS-12 to In Progress", 0.5),
+])
+def test_transition_status_is_captured_whole(prompt, confidence):
+    assert IntentRouter().match(prompt) == (
+        "transition_issue", {"issue_id": "OPS-12", "status": "In Progress"}, confidence
+    )
+
+
+def test_partial_matches_are_routed_only_below_the_threshold():
+    prompt = "Right after lunch, please move OPS-12 to Done"
+    assert IntentRouter(min_confidence=0.9).route(prompt) is None
+    calls = IntentRouter(min_confidence=0.5).route(prompt)
+    assert calls == [{"name": "transition_issue", "arguments": '{"issue_id": "OPS-12", "status": "Done"}'}]
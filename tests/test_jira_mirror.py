@@ -0,0 +1,58 @@
+import pytest
+
+import issue_index
+from jira_mirror import JiraMirror
+from jira_pagination import paginate
+
+
+class FakeJira:
+    # Answers the mirror's JQL with offset pages capped at 50, like Jira Cloud
+    def __init__(self, count):
+        self.issues = {
+            f"OPS-{n}": {"id": str(10000 + n), "key": f"OPS-{n}", "summary": f"Issue {n}", "description": "",
+                         "type": "Task", "updated": "2024-04-01T00:00:00.000+0000", "comments": None}
+            for n in range(1, count + 1)
+        }
+        self.queries = []
+
+    def search(self, jql):
+        self.queries.append(jql)
+        ordered = sorted(self.issues.values(), key=lambda issue: int(issue["key"].split("-")[1]))
+
+        def fetch_page(start, limit):
+            return ordered[start:start + min(limit, 50)], len(ordered)
+
+        return paginate(fetch_page, page_size=100, prefetch=2)
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch):
+    monkeypatch.setattr(issue_index, "_index", None)
+    monkeypatch.setattr(issue_index, "JIRA_INDEX_PATH", None)
+    return JiraMirror(str(tmp_path / "mirror.sqlite3"), projects={"OPS"})
+
+
+def test_full_sync_keeps_issues_on_capped_pages(mirror):
+    jira = FakeJira(250)
+    assert mirror.sync("OPS", jira.search)["fetched"] == 250
+
+    result = mirror.sync("OPS", jira.search, full=True)
+    assert result["fetched"] == 250 and result["removed"] == 0
+    assert len(mirror.issues("OPS")) == 250
+
+
+def test_full_sync_drops_deleted_issues(mirror):
+    jira = FakeJira(120)
+    mirror.sync("OPS", jira.search)
+    del jira.issues["OPS-7"]
+
+    assert mirror.sync("OPS", jira.search, full=True)["removed"] == 1
+    assert mirror.issue("OPS-7") is None
+    assert len(mirror.issues("OPS")) == 119
+
+
+def test_incremental_sync_pages_by_key(mirror):
+    jira = FakeJira(10)
+    mirror.sync("OPS", jira.search)
+    assert mirror.sync("OPS", jira.search)["mode"] == "incremental"
+    assert jira.queries[-1].endswith("ORDER BY key ASC")
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from jira_pagination import paginate
+
+
+def capped_server(count, cap, with_total=True, short_pages=()):
+    # A fake search endpoint returning at most `cap` items, and fewer at the given offsets
+    calls = []
+    lock = threading.Lock()
+
+    def fetch_page(start, limit):
+        with lock:
+            calls.append((start, limit))
+        size = min(limit, cap)
+        if start in short_pages:
+            size = min(size, short_pages[start])
+        items = list(range(start, min(start + size, count)))
+        return items, count if with_total else None
+
+    return fetch_page, calls
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+@pytest.mark.parametrize("with_total", [True, False])
+def test_server_capped_page_size(prefetch, with_total):
+    fetch_page, _ = capped_server(250, cap=50, with_total=with_total)
+    assert list(paginate(fetch_page, page_size=100, prefetch=prefetch)) == list(range(250))
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_short_page_in_the_middle_is_filled(prefetch):
+    fetch_page, calls = capped_server(250, cap=100, short_pages={100: 30})
+    assert list(paginate(fetch_page, page_size=100, prefetch=prefetch)) == list(range(250))
+    assert (130, 70) in calls
+
+
+def test_exact_pages_need_no_extra_requests():
+    fetch_page, calls = capped_server(300, cap=100)
+    assert list(paginate(fetch_page, page_size=100, prefetch=2)) == list(range(300))
+    assert sorted(calls) == [(0, 100), (100, 100), (200, 100)]
+
+
+def test_empty_result():
+    fetch_page, calls = capped_server(0, cap=50)
+    assert list(paginate(fetch_page, page_size=100)) == []
+    assert calls == [(0, 100)]
@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import hmac
+import hashlib
+
+import pytest
+
+import issue_index
+import jira_mirror
+import jira_functions
+import jira_webhooks
+from jira_cache import CacheEntry
+from jira_webhooks import WebhookApplier, changes_from, replay, verify, webhooks_allowed
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "webhooks")
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    # Record what the applier hands over instead of touching the caches
+    batches = []
+    monkeypatch.setattr(jira_webhooks, "_apply", lambda pending: batches.append(dict(pending)))
+    return batches
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    # A mirror serving OPS and NEW plus the full-text index, both in a temporary SQLite file
+    path = str(tmp_path / "mirror.sqlite3")
+    monkeypatch.setattr(issue_index, "JIRA_INDEX_PATH", path)
+    monkeypatch.setattr(issue_index, "_index", issue_index.IssueIndex(path))
+    monkeypatch.setattr(jira_mirror, "JIRA_MIRROR_PATH", path)
+    monkeypatch.setattr(jira_mirror, "_mirror", jira_mirror.JiraMirror(path, projects={"OPS", "NEW"}))
+    monkeypatch.setattr(jira_webhooks, "_applier", None)
+    return jira_mirror.get_mirror(), issue_index.get_index()
+
+
+def test_changes_from_fixtures():
+    created, = load("issue_created.jsonl")
+    assert changes_from(created) == [("OPS-1", {"action": "upsert", "issue": created["issue"], "id": "10001"})]
+
+    deleted, = load("issue_deleted.jsonl")
+    assert changes_from(deleted) == [("OPS-3", {"action": "delete", "issue": None, "id": "10003"})]
+
+    # A move upserts the new key and deletes the old one
+    moved, = load("issue_moved.jsonl")
+    assert [(key, change["action"]) for key, change in changes_from(moved)] == [("NEW-5", "upsert"), ("OPS-2", "delete")]
+
+    # Comment payloads carry a partial issue: drop cached reads only
+    for event in load("comment_events.jsonl"):
+        (key, change), = changes_from(event)
+        assert change == {"action": "invalidate", "issue": None, "id": event["issue"]["id"]}
+
+    assert changes_from({"webhookEvent": "jira:worklog_updated", "issue": {"key": "OPS-1"}}) == []
+
+
+def test_burst_is_debounced_and_coalesced(applied):
+    applier = WebhookApplier(debounce=0.2, max_delay=5)
+    updates = load("issue_updated.jsonl")
+    for event in load("issue_created.jsonl") + updates:
+        applier.submit(event)
+
+    # Nothing is applied while the burst is still settling
+    time.sleep(0.05)
+    assert applied == []
+    assert wait_for(lambda: applied)
+
+    batch, = applied
+    assert sorted(batch) == ["OPS-1", "OPS-4"]
+    # The last upsert of OPS-1 wins
+    assert batch["OPS-1"]["issue"]["fields"]["summary"] == "Checkout page times out under peak load"
+    assert applier.stats() == {"events": 4, "ignored": 0, "coalesced": 2, "applied": 2, "errors": 0, "pending": 0}
+
+
+def test_stronger_action_wins_within_a_burst(applied):
+    applier = WebhookApplier(debounce=60, max_delay=60)
+    created, = load("issue_created.jsonl")
+    deleted, = load("issue_deleted.jsonl")
+    comment = load("comment_events.jsonl")[0]
+    for event in (dict(deleted, issue=dict(deleted["issue"], key="OPS-1")), created, dict(comment, issue=created["issue"])):
+        applier.submit(event)
+    applier.flush()
+
+    batch, = applied
+    assert batch["OPS-1"]["action"] == "delete"
+
+
+def test_max_delay_bounds_a_steady_stream(applied):
+    applier = WebhookApplier(debounce=0.2, max_delay=0.3)
+    event = load("issue_updated.jsonl")[0]
+    start = time.time()
+    # Events keep arriving faster than the debounce, yet a batch goes out after max_delay
+    while not applied and time.time() - start < 2:
+        applier.submit(event)
+        time.sleep(0.05)
+    assert applied
+    assert time.time() - start < 1
+
+
+def test_replay_updates_mirror_index_and_cache(stores):
+    mirror, index = stores
+    mirror.put([
+        {"id": "10002", "key": "OPS-2", "summary": "Search index rebuild stalls", "description": "Reindex never finishes",
+         "type": "Task", "updated": "2024-04-01T00:00:00.000+0000", "comments": []},
+        {"id": "10003", "key": "OPS-3", "summary": "Obsolete dashboard widget", "description": "Remove the legacy uptime tile",
+         "type": "Task", "updated": "2024-04-01T00:00:00.000+0000", "comments": []},
+    ])
+    for key in ("OPS-4", "OPS-6"):
+        jira_functions.issue_cache._store(f"comments:{key}", CacheEntry({"comments": []}, None, time.time()))
+
+    names = ["issue_created.jsonl", "issue_updated.jsonl", "issue_deleted.jsonl", "issue_moved.jsonl", "comment_events.jsonl"]
+    assert replay([os.path.join(FIXTURES, name) for name in names]) == 9
+
+    # Created, updated and moved issues are stored from the payloads; deleted and moved-away keys are gone
+    assert [record.key for record in mirror.issues("OPS")] == ["OPS-1", "OPS-4"]
+    assert mirror.issue("OPS-1")["summary"] == "Checkout page times out under peak load"
+    assert mirror.issue("NEW-5")["summary"] == "Search index rebuild stalls"
+    assert mirror.issue("OPS-2") is None and mirror.issue("OPS-3") is None
+
+    assert [match["key"] for match in index.search("checkout peak load")] == ["OPS-1"]
+    assert [match["key"] for match in index.search("reindex stalls")] == ["NEW-5"]
+    assert index.search("obsolete dashboard widget") == []
+
+    # Comment events only drop the cached reads
+    for key in ("OPS-4", "OPS-6"):
+        assert jira_functions.issue_cache._lookup(f"comments:{key}") is None
+    assert jira_webhooks.get_applier().stats()["applied"] == 6
+
+
+def test_verify_signature_and_query_secret():
+    body = b'{"webhookEvent": "jira:issue_created"}'
+    digest = hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+    assert verify(body, {"X-Hub-Signature": f"sha256={digest}"}, {}, secret="s3cret")
+    assert not verify(body, {"X-Hub-Signature": "sha256=" + "0" * 64}, {}, secret="s3cret")
+    assert verify(body, {}, {"secret": ["s3cret"]}, secret="s3cret")
+    assert not verify(body, {}, {}, secret="s3cret")
+
+
+def test_unsigned_webhooks_only_on_local_listeners(monkeypatch):
+    monkeypatch.setattr(jira_webhooks, "JIRA_WEBHOOK_SECRET", None)
+    assert webhooks_allowed("127.0.0.1")
+    assert webhooks_allowed("localhost")
+    assert webhooks_allowed(None)
+    assert not webhooks_allowed("0.0.0.0")
+    assert not webhooks_allowed("10.1.2.3")
+
+    monkeypatch.setattr(jira_webhooks, "JIRA_WEBHOOK_SECRET", "s3cret")
+    assert webhooks_allowed("0.0.0.0")
@@ -0,0 +1,12 @@
+from response_cache import cache_key, normalize_prompt
+
+
+def test_whitespace_and_trailing_punctuation_are_ignored():
+    assert normalize_prompt("  List issues\n in   ABC ?! ") == "List issues in ABC"
+    assert cache_key("m", "s", "List issues in ABC.", "t") == cache_key("m", "s", "List issues  in ABC", "t")
+
+
+def test_case_is_kept():
+    # The cached tool arguments would carry the first prompt's casing
+    first = cache_key("m", "s", 'Create a bug "Login fails on iOS"', "t")
+    assert first != cache_key("m", "s", 'Create a bug "login fails on ios"', "t")
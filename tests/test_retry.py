@@ -0,0 +1,32 @@
+from types import SimpleNamespace
+
+import pytest
+
+from retry import retry_after
+
+
+def error(status, headers):
+    return SimpleNamespace(status_code=status, response=SimpleNamespace(status_code=status, headers=headers))
+
+
+OPENAI_HEADERS = {"x-ratelimit-reset-requests": "6m0s", "x-ratelimit-reset-tokens": "250ms"}
+
+
+def test_rate_limit_reset_headers_apply_to_429_only():
+    assert retry_after(error(429, OPENAI_HEADERS)) == 360
+    assert retry_after(error(503, OPENAI_HEADERS)) is None
+    assert retry_after(error(500, {"X-RateLimit-Reset": "30"})) is None
+    assert retry_after(error(429, {"X-RateLimit-Reset": "30"})) == 30
+
+
+def test_retry_after_applies_to_any_status():
+    assert retry_after(error(503, {"Retry-After": "7"})) == 7
+
+
+@pytest.mark.parametrize("headers", [
+    {"Retry-After": "soon"},
+    {"Retry-After": "Mon, 99 Foo 2024 12:00:00 GMT"},
+    {"X-RateLimit-Reset": "not-a-date"},
+])
+def test_malformed_headers_fall_back_to_backoff(headers):
+    assert retry_after(error(429, headers)) is None
@@ -0,0 +1,165 @@
+import os
+import json
+import weakref
+import threading
+import contextvars
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+import tracing
+
+# Tools that talk to Datadog; everything else is routed to Jira
+DATADOG_TOOLS = {"send_custom_metric", "log_event", "send_service_check"}
+# Tools served in-process; they take no backend slot
+LOCAL_TOOLS = {"get_result_page"}
+
+# Concurrency limits (overall pool size and per backend)
+MAX_WORKERS = int(os.getenv("TOOL_DISPATCH_MAX_WORKERS", "8"))
+BACKEND_LIMITS = {
+    "jira": int(os.getenv("JIRA_MAX_CONCURRENCY", "4")),
+    "datadog": int(os.getenv("DATADOG_MAX_CONCURRENCY", "4")),
+}
+
+_backend_slots = {
+    backend: threading.BoundedSemaphore(limit)
+    for backend, limit in BACKEND_LIMITS.items()
+}
+
+
+def backend_for(name):
+    if name in LOCAL_TOOLS:
+        return "local"
+    return "datadog" if name in DATADOG_TOOLS else "jira"
+
+
+def _slot(backend):
+    return _backend_slots.get(backend) or nullcontext()
+
+
+def _parse_arguments(tool_call):
+    # Returns (args, None), or (None, error result) when the model sent malformed JSON
+    name = tool_call.function.name
+    try:
+        with tracing.span("tool.parse_args", tool=name):
+            return json.loads(tool_call.function.arguments or "{}"), None
+    except json.JSONDecodeError as e:
+        return None, {
+            "tool_call_id": tool_call.id,
+            "name": name,
+            "args": None,
+            "result": {"error": f"Invalid arguments for '{name}': {e}"}
+        }
+
+
+def _run_tool_call(tool_call, call_function):
+    name = tool_call.function.name
+    args, invalid = _parse_arguments(tool_call)
+    if invalid:
+        return invalid
+
+    with _slot(backend_for(name)):
+        try:
+            result = call_function(name, args)
+        except Exception as e:
+            result = {"error": str(e)}
+
+    return {
+        "tool_call_id": tool_call.id,
+        "name": name,
+        "args": args,
+        "result": result
+    }
+
+
+def dispatch_tool_calls(tool_calls, call_function, max_workers=MAX_WORKERS):
+    """
+    Runs every tool call returned by the model on a bounded thread pool.
+    :param tool_calls: The tool calls from the model response
+    :param call_function: The dispatcher used to execute a single call
+    :param max_workers: Upper bound on calls running at the same time
+    :return: One result dict per tool call, in the order they were returned
+    """
+    tool_calls = list(tool_calls or [])
+    if len(tool_calls) <= 1:
+        return [_run_tool_call(tool_call, call_function) for tool_call in tool_calls]
+
+    # Each worker runs in a copy of the caller's context so its spans join the current trace
+    contexts = [contextvars.copy_context() for _ in tool_calls]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tool_calls))) as pool:
+        return list(pool.map(
+            lambda tool_call, context: context.run(_run_tool_call, tool_call, call_function),
+            tool_calls,
+            contexts
+        ))
+
+
+class StreamingDispatcher:
+    """
+    Starts tool calls one at a time as they become available, e.g. while a
+    streamed model response is still arriving, and collects results in order.
+    """
+
+    def __init__(self, call_function, max_workers=MAX_WORKERS):
+        self.call_function = call_function
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = {}
+
+    def submit(self, index, tool_call):
+        self._futures[index] = self._pool.submit(
+            contextvars.copy_context().run, _run_tool_call, tool_call, self.call_function
+        )
+
+    def results(self):
+        try:
+            return [self._futures[index].result() for index in sorted(self._futures)]
+        finally:
+            self._pool.shutdown()
+
+
+_async_backend_slots = weakref.WeakKeyDictionary()
+
+
+def _async_slot(backend):
+    if backend not in BACKEND_LIMITS:
+        return nullcontext()
+    # asyncio semaphores bind to the running loop on first use, so create them lazily
+    import asyncio
+    loop = asyncio.get_running_loop()
+    slots = _async_backend_slots.get(loop)
+    if slots is None:
+        slots = _async_backend_slots[loop] = {
+            name: asyncio.Semaphore(limit) for name, limit in BACKEND_LIMITS.items()
+        }
+    return slots[backend]
+
+
+async def _run_tool_call_async(tool_call, call_function):
+    name = tool_call.function.name
+    args, invalid = _parse_arguments(tool_call)
+    if invalid:
+        return invalid
+
+    async with _async_slot(backend_for(name)):
+        try:
+            result = await call_function(name, args)
+        except Exception as e:
+            result = {"error": str(e)}
+
+    return {
+        "tool_call_id": tool_call.id,
+        "name": name,
+        "args": args,
+        "result": result
+    }
+
+
+async def dispatch_tool_calls_async(tool_calls, call_function):
+    """
+    Async counterpart of dispatch_tool_calls; calls run concurrently on the event loop.
+    :param tool_calls: The tool calls from the model response
+    :param call_function: Coroutine function used to execute a single call
+    :return: One result dict per tool call, in the order they were returned
+    """
+    import asyncio
+    return list(await asyncio.gather(
+        *(_run_tool_call_async(tool_call, call_function) for tool_call in tool_calls or [])
+    ))
@@ -0,0 +1,132 @@
+import os
+import re
+import json
+import hashlib
+import threading
+
+# Send only the tool schemas a prompt can plausibly need; "false" always sends the full catalogue
+TOOL_PRUNING = os.getenv("TOOL_PRUNING", "true").lower() in ("1", "true", "yes")
+
+# Tool groups and the prompt words that pull each group in. Words are matched after light stemming.
+TOOL_GROUPS = {
+    "jira_read": {
+        "tools": [
+            "get_issue", "get_issues", "search_issues", "get_issue_comments", "get_issue_transitions", "get_result_page"
+        ],
+        "keywords": {
+            "get", "show", "find", "list", "view", "read", "fetch", "display", "describe", "detail",
+            "status", "comment", "transition", "issue", "ticket", "bug", "task", "story", "epic", "project",
+            "backlog", "jira", "search", "duplicate", "similar", "existing", "already"
+        }
+    },
+    "jira_write": {
+        "tools": ["create_issue", "update_issue", "delete_issue", "transition_issue", "get_issue_transitions"],
+        "keywords": {
+            "create", "new", "add", "file", "open", "raise", "report", "update", "change", "edit", "rename",
+            "set", "delete", "remove", "close", "resolve", "move", "transition", "start", "finish", "done",
+            "reopen", "progress", "mark", "issue", "ticket", "bug", "task", "story", "epic", "jira"
+        }
+    },
+    "jira_bulk": {
+        "tools": ["bulk_create_issues", "bulk_update_issues", "bulk_transition_issues", "get_result_page"],
+        "keywords": {"bulk", "batch", "all", "every", "each", "multiple", "several", "many", "both"}
+    },
+    "datadog": {
+        "tools": ["send_custom_metric", "log_event", "send_service_check"],
+        "keywords": {
+            "datadog", "metric", "gauge", "count", "counter", "histogram", "distribution", "rate", "event",
+            "log", "alert", "service", "check", "monitor", "health", "deploy", "deployed", "deployment",
+            "tag", "latency", "dashboard", "incident"
+        }
+    },
+}
+
+ISSUE_KEY_PATTERN = re.compile(r"\b[A-Z][A-Z0-9]+-\d+\b")
+# "5 tasks", "three bugs": asking for several issues at once
+PLURAL_COUNT_PATTERN = re.compile(
+    r"\b(\d+|two|three|four|five|six|seven|eight|nine|ten)\s+(?:\w+\s+)?(issues|tickets|bugs|tasks|stories)\b",
+    re.IGNORECASE
+)
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+
+def _stem(word):
+    # Crude, but applied to prompts and keywords alike: "created"/"creates"/"create" -> "creat"
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    for suffix in ("ing", "ed", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    return word[:-1] if word.endswith("e") and len(word) > 3 else word
+
+
+class ToolSelection:
+    __slots__ = ("names", "tools", "digest", "payload_bytes")
+
+    def __init__(self, names, tools, digest, payload_bytes):
+        self.names = names
+        self.tools = tools
+        self.digest = digest
+        self.payload_bytes = payload_bytes
+
+
+class ToolSelector:
+    """
+    Picks the subset of tool schemas to send with a prompt.
+
+    Prompt words are matched against each group's keywords. Anything not
+    clearly matched falls back to the full catalogue, so pruning never hides
+    a tool the model would have needed. Each distinct subset is serialized
+    and hashed once.
+    """
+
+    def __init__(self, tools, groups=TOOL_GROUPS, enabled=TOOL_PRUNING):
+        self.tools = tools
+        self.enabled = enabled
+        self.groups = {
+            name: {"tools": set(group["tools"]), "keywords": {_stem(word) for word in group["keywords"]}}
+            for name, group in groups.items()
+        }
+        grouped = set().union(*(group["tools"] for group in self.groups.values()))
+        # Tools outside every group are always sent
+        self._ungrouped = {tool["function"]["name"] for tool in tools} - grouped
+        self._selections = {}
+        self._lock = threading.Lock()
+
+    def groups_for(self, prompt):
+        words = {_stem(word) for word in WORD_PATTERN.findall(prompt.lower())}
+        matched = {name for name, group in self.groups.items() if words & group["keywords"]}
+        keys = set(ISSUE_KEY_PATTERN.findall(prompt))
+        if keys:
+            matched |= {"jira_read", "jira_write"}
+        if len(keys) > 1 or PLURAL_COUNT_PATTERN.search(prompt):
+            matched.add("jira_bulk")
+        if "jira_bulk" in matched and not matched & {"jira_read", "jira_write"}:
+            # "all"/"each" on its own says nothing about Jira
+            matched.discard("jira_bulk")
+        return matched & self.groups.keys()
+
+    def select(self, prompt):
+        """
+        Returns the tool schemas to send for a prompt.
+        :param prompt: The user prompt
+        :return: A ToolSelection; .tools is the same list object for the same subset
+        """
+        groups = self.groups_for(prompt) if self.enabled else set()
+        names = set(self._ungrouped)
+        for name in groups:
+            names |= self.groups[name]["tools"]
+        if not groups:
+            names = {tool["function"]["name"] for tool in self.tools}
+        key = frozenset(names)
+
+        with self._lock:
+            selection = self._selections.get(key)
+            if selection is None:
+                tools = [tool for tool in self.tools if tool["function"]["name"] in key]
+                payload = json.dumps(tools, sort_keys=True).encode("utf-8")
+                selection = self._selections[key] = ToolSelection(
+                    sorted(key), tools, hashlib.sha256(payload).hexdigest(), len(payload)
+                )
+        return selection
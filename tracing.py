@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import inspect
+import secrets
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Where finished traces are appended, one OTLP/JSON ExportTraceServiceRequest per line; unset disables export
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "genai-jira-datadog-agent")
+
+_current = contextvars.ContextVar("current_span", default=None)
+# Spans finished outside any trace (e.g. at import time), attached to the next trace
+_pending = []
+_pending_lock = threading.Lock()
+_export_lock = threading.Lock()
+_last_trace = None
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent", "attributes", "children", "start_ns", "end_ns")
+
+    def __init__(self, name, parent, attributes):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.attributes = attributes
+        self.children = []
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def seconds(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+
+@contextmanager
+def _span(name, root, attributes):
+    parent = None if root else _current.get()
+    current = Span(name, parent, attributes)
+    if root:
+        with _pending_lock:
+            current.children.extend(_pending)
+            _pending.clear()
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes["error"] = str(e) or type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current.reset(token)
+        if root:
+            _finish(current)
+        elif parent is not None:
+            parent.children.append(current)
+        else:
+            with _pending_lock:
+                _pending.append(current)
+
+
+def span(name, **attributes):
+    """
+    Times a stage of the current trace.
+    :param name: Stage name, e.g. "llm.request"
+    :param attributes: Initial span attributes; more can be added with Span.set()
+    :return: A context manager yielding the Span
+    """
+    return _span(name, False, attributes)
+
+
+def trace(name, **attributes):
+    # Starts a new trace; spans opened inside it, in this thread or in tasks/threads that copy the context, nest under it
+    return _span(name, True, attributes)
+
+
+def traced(name, root=False):
+    """Decorator form of span()/trace() for sync and coroutine functions."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _span(name, root, {}):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _span(name, root, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def last_trace():
+    return _last_trace
+
+
+def _finish(root):
+    global _last_trace
+    _last_trace = root
+    if TRACE_EXPORT_PATH:
+        line = json.dumps(to_otlp(root))
+        with _export_lock, open(TRACE_EXPORT_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _walk(root):
+    yield root
+    for child in root.children:
+        yield from _walk(child)
+
+
+def to_otlp(root):
+    spans = []
+    for current in _walk(root):
+        spans.append({
+            "traceId": root.trace_id,
+            "spanId": current.span_id,
+            # Adopted startup spans were recorded before the trace existed
+            "parentSpanId": "" if current is root else (current.parent or root).span_id,
+            "name": current.name,
+            "kind": 1,
+            "startTimeUnixNano": str(current.start_ns),
+            "endTimeUnixNano": str(current.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in current.attributes.items()],
+            "status": {"code": 2, "message": current.attributes["error"]} if "error" in current.attributes else {}
+        })
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}]
+    }]}
+
+
+def print_summary(root):
+    if root is None:
+        print("[WARN] No trace was recorded.")
+        return
+    total = root.seconds or 1e-9
+    print(f"[TRACE] {root.trace_id}")
+
+    def show(current, depth):
+        attributes = " ".join(f"{key}={value}" for key, value in current.attributes.items())
+        print(
+            f"         {current.seconds * 1000:>9.1f} ms {current.seconds / total:>6.1%}  "
+            f"{'  ' * depth}{current.name}" + (f"  [{attributes}]" if attributes else "")
+        )
+        for child in sorted(current.children, key=lambda child: child.start_ns):
+            show(child, depth + 1)
+
+    show(root, 0)